@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""Measure what the recorder, the players and the title poller cost.
+
+Every component is run against the local synthetic stream server
+(benchmarks/stream_server.py) for a fixed duration and we report CPU time,
+peak RSS, connection count, bytes transferred and start-to-first-byte
+latency. Run from the repository root:
+
+    python benchmarks/run_benchmarks.py --duration 10 --bitrate 128
+    python benchmarks/run_benchmarks.py --only recorder,ffplay --json out.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from shutil import which
+
+import psutil
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stream_server import StreamServer  # noqa: E402
+
+from radioactive.player import create_player  # noqa: E402
+from radioactive.progress import progress_reader, progress_store  # noqa: E402
+from radioactive.recorder import (  # noqa: E402
+    start_recording_process,
+    stop_recording_process,
+)
+from radioactive.utilities import get_song_title  # noqa: E402
+
+
+class ResourceSampler:
+    """Samples CPU and RSS of this process and all of its children"""
+
+    def __init__(self, interval=0.25):
+        self.interval = interval
+        self.me = psutil.Process()
+        self.child_cpu = {}
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        rss = self.me.memory_info().rss
+        for child in self.me.children(recursive=True):
+            try:
+                with child.oneshot():
+                    t = child.cpu_times()
+                    self.child_cpu[child.pid] = t.user + t.system
+                    rss += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+        self.peak_rss = max(self.peak_rss, rss)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        t = self.me.cpu_times()
+        self._self_cpu = t.user + t.system
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._sample()
+        self._stop.set()
+        self._thread.join()
+        t = self.me.cpu_times()
+        own = t.user + t.system - self._self_cpu
+        return own + sum(self.child_cpu.values()), self.peak_rss
+
+
+def run_recorder(url, duration, workdir, force_mp3=False):
+    outfile = os.path.join(workdir, "bench-record.mp3" if force_mp3 else "bench.mp3")
+    proc = start_recording_process(url, outfile, force_mp3, "error")
+    if proc is None:
+        raise RuntimeError("recorder did not start")
+    progress_reader.watch(outfile, proc.stdout)
+    time.sleep(duration)
+    stop_recording_process(proc)
+    snapshot = progress_store.get(outfile) or {}
+    return {
+        "output_bytes": os.path.getsize(outfile) if os.path.exists(outfile) else 0,
+        "speed": snapshot.get("speed"),
+    }
+
+
+def run_player(name, url, duration):
+    player = create_player(name, 0, "error")
+    player.start(url)
+    time.sleep(duration)
+    player.stop()
+    return {}
+
+
+def run_title_poller(url, duration):
+    calls = []
+    deadline = time.monotonic() + duration
+    titles = set()
+    while time.monotonic() < deadline:
+        t0 = time.monotonic()
+        titles.add(get_song_title(url))
+        calls.append(time.monotonic() - t0)
+    return {
+        "calls": len(calls),
+        "avg_call_s": round(sum(calls) / len(calls), 3) if calls else None,
+        "titles_seen": len(titles - {""}),
+    }
+
+
+def benchmark(server, name, fn, *args):
+    server.stats.reset()
+    sampler = ResourceSampler()
+    sampler.start()
+    started = time.monotonic()
+    try:
+        extra = fn(*args)
+        error = None
+    except Exception as e:
+        extra = {}
+        error = str(e)
+    elapsed = time.monotonic() - started
+    cpu, rss = sampler.stop()
+    # give the server a moment to notice closed connections
+    time.sleep(0.2)
+    stats = server.stats.snapshot()
+    first_bytes = stats.pop("first_byte_times")
+    result = {
+        "component": name,
+        "seconds": round(elapsed, 2),
+        "cpu_seconds": round(cpu, 3),
+        "cpu_percent": round(100 * cpu / elapsed, 1) if elapsed else 0.0,
+        "peak_rss_mb": round(rss / 1024 / 1024, 1),
+        "first_byte_s": round(first_bytes[0] - started, 3) if first_bytes else None,
+        "error": error,
+    }
+    result.update(stats)
+    result.update(extra)
+    return result
+
+
+def print_results(results):
+    table = Table(show_header=True, header_style="magenta", expand=True)
+    columns = [
+        "component", "cpu_seconds", "cpu_percent", "peak_rss_mb",
+        "connections", "peak_connections", "bytes_sent", "first_byte_s",
+    ]
+    for col in columns:
+        table.add_column(col)
+    for res in results:
+        table.add_row(*[str(res.get(col, "")) for col in columns])
+    Console().print(table)
+    for res in results:
+        if res.get("error"):
+            print(f"{res['component']}: {res['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="radio-active benchmarks")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--bitrate", type=int, default=128)
+    parser.add_argument("--format", default="mp3", choices=["mp3", "aac"])
+    parser.add_argument("--metaint", type=int, default=16000)
+    parser.add_argument(
+        "--only",
+        default="",
+        help="comma separated: recorder,recorder-mp3,ffplay,mpv,vlc,title-poller",
+    )
+    parser.add_argument("--json", dest="json_path", default="")
+    args = parser.parse_args()
+
+    # keep players off the sound card
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    mpv_home = tempfile.mkdtemp(prefix="radioactive-mpv-")
+    with open(os.path.join(mpv_home, "mpv.conf"), "w") as f:
+        f.write("ao=null\nvo=null\n")
+    os.environ.setdefault("MPV_HOME", mpv_home)
+
+    server = StreamServer().start()
+    url = server.url(args.format, args.bitrate, args.metaint)
+    workdir = tempfile.mkdtemp(prefix="radioactive-bench-")
+
+    components = [
+        ("recorder", "ffmpeg", run_recorder, (url, args.duration, workdir)),
+        ("recorder-mp3", "ffmpeg", run_recorder, (url, args.duration, workdir, True)),
+        ("ffplay", "ffplay", run_player, ("ffplay", url, args.duration)),
+        ("mpv", "mpv", run_player, ("mpv", url, args.duration)),
+        ("vlc", "vlc", run_player, ("vlc", url, args.duration)),
+        ("title-poller", "ffprobe", run_title_poller, (url, args.duration)),
+    ]
+    only = [c.strip() for c in args.only.split(",") if c.strip()]
+
+    results = []
+    for name, program, fn, fn_args in components:
+        if only and name not in only:
+            continue
+        if which(program) is None:
+            print(f"skipping {name}: {program} not found")
+            continue
+        print(f"running {name} for {args.duration}s ...")
+        results.append(benchmark(server, name, fn, *fn_args))
+
+    server.stop()
+    print_results(results)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(
+                {"bitrate": args.bitrate, "format": args.format, "results": results},
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
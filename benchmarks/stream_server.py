@@ -0,0 +1,241 @@
+"""A local HTTP/ICY radio server serving synthetic audio for benchmarks.
+
+    GET /stream.mp3?bitrate=128&metaint=16000
+    GET /stream.aac?bitrate=64
+
+MP3 is built from silent MPEG-1 Layer III frames, AAC is pre-encoded once
+with ffmpeg (anullsrc). Streams are paced in real time unless the server is
+created with burst=True. Every connection is accounted in ServerStats.
+"""
+
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from shutil import which
+from urllib.parse import parse_qs, urlparse
+
+# MPEG-1 Layer III bitrate index table (kbps -> index)
+_MP3_BITRATES = {
+    32: 1, 40: 2, 48: 3, 56: 4, 64: 5, 80: 6, 96: 7,
+    112: 8, 128: 9, 160: 10, 192: 11, 224: 12, 256: 13, 320: 14,
+}
+_SAMPLE_RATE = 44100
+_SAMPLES_PER_FRAME = 1152
+
+_payload_cache = {}
+
+
+def synthetic_mp3(bitrate, seconds=10):
+    """Silent MP3 frames; the zeroed side info decodes as silence"""
+    if bitrate not in _MP3_BITRATES:
+        raise ValueError(f"unsupported mp3 bitrate: {bitrate}")
+    frames = []
+    n_frames = int(seconds * _SAMPLE_RATE / _SAMPLES_PER_FRAME)
+    exact = 144 * bitrate * 1000 / _SAMPLE_RATE
+    acc = 0.0
+    for _ in range(n_frames):
+        acc += exact - int(exact)
+        padding = 1 if acc >= 1 else 0
+        acc -= padding
+        header = bytes(
+            [0xFF, 0xFB, (_MP3_BITRATES[bitrate] << 4) | (padding << 1), 0x00]
+        )
+        frames.append(header + bytes(int(exact) + padding - 4))
+    return b"".join(frames)
+
+
+def synthetic_aac(bitrate, seconds=10):
+    """ADTS AAC silence, encoded once with ffmpeg"""
+    if which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg is needed to generate the AAC payload")
+    cmd = [
+        "ffmpeg", "-v", "error", "-f", "lavfi",
+        "-i", f"anullsrc=r={_SAMPLE_RATE}:cl=stereo", "-t", str(seconds),
+        "-c:a", "aac", "-b:a", f"{bitrate}k", "-f", "adts", "-",
+    ]
+    return subprocess.check_output(cmd)
+
+
+def get_payload(fmt, bitrate):
+    key = (fmt, bitrate)
+    if key not in _payload_cache:
+        if fmt == "mp3":
+            _payload_cache[key] = synthetic_mp3(bitrate)
+        elif fmt == "aac":
+            _payload_cache[key] = synthetic_aac(bitrate)
+        else:
+            raise ValueError(f"unsupported format: {fmt}")
+    return _payload_cache[key]
+
+
+class ServerStats:
+    """Connection and transfer accounting, reset between benchmark runs"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.connections = 0
+            self.active = 0
+            self.peak_active = 0
+            self.bytes_sent = 0
+            self.first_byte_times = []
+
+    def opened(self):
+        with self.lock:
+            self.connections += 1
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+
+    def closed(self):
+        with self.lock:
+            self.active -= 1
+
+    def sent(self, n):
+        with self.lock:
+            self.bytes_sent += n
+
+    def first_byte(self, ts):
+        with self.lock:
+            self.first_byte_times.append(ts)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "connections": self.connections,
+                "peak_connections": self.peak_active,
+                "bytes_sent": self.bytes_sent,
+                "first_byte_times": list(self.first_byte_times),
+            }
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.0"
+    chunk_seconds = 0.1
+
+    def log_message(self, format, *args):
+        # keep the benchmark output clean
+        pass
+
+    def do_HEAD(self):
+        self._serve(body=False)
+
+    def do_GET(self):
+        self._serve(body=True)
+
+    def _serve(self, body):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        fmt = parsed.path.rsplit(".", 1)[-1]
+        try:
+            bitrate = int(query.get("bitrate", ["128"])[0])
+            metaint = int(query.get("metaint", ["16000"])[0])
+            payload = get_payload(fmt, bitrate)
+        except Exception as e:
+            self.send_error(404, str(e))
+            return
+
+        want_meta = self.headers.get("Icy-MetaData") == "1" and metaint > 0
+        self.send_response(200)
+        self.send_header(
+            "Content-Type", "audio/mpeg" if fmt == "mp3" else "audio/aac"
+        )
+        self.send_header("icy-name", f"Synthetic {fmt.upper()} {bitrate}k")
+        self.send_header("icy-br", str(bitrate))
+        if want_meta:
+            self.send_header("icy-metaint", str(metaint))
+        self.end_headers()
+        if not body:
+            return
+
+        stats = self.server.stats
+        stats.opened()
+        try:
+            self._stream(payload, bitrate, metaint if want_meta else 0)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            stats.closed()
+
+    def _stream(self, payload, bitrate, metaint):
+        stats = self.server.stats
+        rate = bitrate * 1000 // 8
+        chunk = max(1, int(rate * self.chunk_seconds))
+        pos = 0
+        since_meta = 0
+        track = 0
+        started = time.monotonic()
+        sent = 0
+        while True:
+            data = bytearray()
+            want = chunk
+            while want > 0:
+                part = payload[pos:pos + want]
+                if metaint:
+                    part = part[: metaint - since_meta]
+                data += part
+                pos = (pos + len(part)) % len(payload)
+                want -= len(part)
+                since_meta += len(part)
+                if metaint and since_meta == metaint:
+                    track += 1
+                    data += _icy_block(f"Synthetic Artist - Track {track // 4}")
+                    since_meta = 0
+            self.wfile.write(data)
+            if sent == 0:
+                stats.first_byte(time.monotonic())
+            sent += len(data)
+            stats.sent(len(data))
+            if not self.server.burst:
+                # real-time pacing
+                ahead = sent / rate - (time.monotonic() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+
+def _icy_block(title):
+    meta = f"StreamTitle='{title}';".encode("utf8")
+    blocks = (len(meta) + 15) // 16
+    return bytes([blocks]) + meta.ljust(blocks * 16, b"\0")
+
+
+class StreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, burst=False):
+        super().__init__((host, port), _StreamHandler)
+        self.stats = ServerStats()
+        self.burst = burst
+        self._thread = None
+
+    def url(self, fmt="mp3", bitrate=128, metaint=16000):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/stream.{fmt}?bitrate={bitrate}&metaint={metaint}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Synthetic ICY stream server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--burst", action="store_true", default=False)
+    args = parser.parse_args()
+
+    server = StreamServer(port=args.port, burst=args.burst)
+    print(f"Serving on {server.url()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -6,17 +6,21 @@ from time import sleep
 
 from zenlog import log
 
+from radioactive import tracing
 from radioactive.alias import Alias
 from radioactive.app import App
-from radioactive.ffplay import Ffplay, kill_background_ffplays
+from radioactive.ffplay import kill_background_ffplays
 from radioactive.handler import Handler
 from radioactive.help import show_help
 from radioactive.last_station import Last_station
+from radioactive.metrics import serve_metrics, write_metrics_file
 from radioactive.parser import parse_options
+from radioactive.player import available_backends, create_player
 from radioactive.utilities import (
     check_sort_by_parameter,
     handle_add_station,
     handle_add_to_favorite,
+    handle_check_favorites,
     handle_current_play_panel,
     handle_direct_play,
     handle_favorite_table,
@@ -24,6 +28,7 @@ from radioactive.utilities import (
     handle_play_last_station,
     handle_play_random_station,
     handle_record,
+    handle_recordings_table,
     handle_save_last_station,
     handle_search_stations,
     handle_station_selection_menu,
@@ -31,18 +36,22 @@ from radioactive.utilities import (
     handle_update_screen,
     handle_user_choice_from_search_result,
     handle_welcome_screen,
+    refresh_stale_favorites,
     start_now_playing_live,
     set_force_mp3,
+    set_now_playing_player,
+    set_postprocess,
+    start_adaptive_bitrate,
+    start_failover_session,
+    stop_active_recording,
 )
 
 # globally needed as signal handler needs it
 # to terminate main() properly
-ffplay = None
 player = None
 
 
 def final_step(options, last_station, alias, handler):
-    global ffplay  # always needed
     global player
 
     # check target URL for the last time
@@ -50,27 +59,21 @@ def final_step(options, last_station, alias, handler):
         log.error("something is wrong with the url")
         sys.exit(1)
 
-    if options["audio_player"] == "vlc":
-        from radioactive.vlc import VLC
-
-        vlc = VLC()
-        vlc.start(options["target_url"])
-        player = vlc
-
-    elif options["audio_player"] == "mpv":
-        from radioactive.mpv import MPV
-
-        mpv = MPV()
-        mpv.start(options["target_url"])
-        player = mpv
-
-    elif options["audio_player"] == "ffplay":
-        ffplay = Ffplay(options["target_url"], options["volume"], options["loglevel"])
-        player = ffplay
-
-    else:
+    player = create_player(
+        options["audio_player"], options["volume"], options["loglevel"]
+    )
+    if player is None:
         log.error("Unsupported media player selected")
+        log.error(f"Choose from: {', '.join(available_backends())}")
         sys.exit(1)
+    # playlists are resolved here, and a variant of the station that worked
+    # better last time may be picked
+    with tracing.span("resolve_stream", url=options["target_url"]):
+        stream_url = start_failover_session(
+            options["target_url"], handler, options["curr_station_name"]
+        )
+    with tracing.span("player_start", player=player.name):
+        player.start(stream_url)
 
     if options["curr_station_name"].strip() == "":
         options["curr_station_name"] = "N/A"
@@ -81,6 +84,12 @@ def final_step(options, last_station, alias, handler):
 
     # Apply recording behaviour from config/args
     set_force_mp3(options.get("force_mp3", False))
+    set_postprocess(
+        options.get("postprocess", False),
+        options.get("postprocess_workers", 1),
+        options.get("postprocess_nice", 10),
+        options.get("postprocess_loudnorm", True),
+    )
 
     if options["add_to_favorite"]:
         handle_add_to_favorite(
@@ -88,11 +97,14 @@ def final_step(options, last_station, alias, handler):
         )
 
     # Start Live Now Playing view (song updates + keys/info below)
-    start_now_playing_live(options["curr_station_name"], options["target_url"], interval_seconds=15)
+    set_now_playing_player(player)
+    start_adaptive_bitrate(player)
+    refresh_stale_favorites(handler, alias)
+    start_now_playing_live(options["curr_station_name"], stream_url, interval_seconds=15)
 
     if options["record_stream"]:
         handle_record(
-            options["target_url"],
+            stream_url,
             options["curr_station_name"],
             options["record_file_path"],
             options["record_file"],
@@ -104,7 +116,7 @@ def final_step(options, last_station, alias, handler):
         alias,
         handler,
         player,
-        target_url=options["target_url"],
+        target_url=stream_url,
         station_name=options["curr_station_name"],
         station_url=options["target_url"],
         record_file_path=options["record_file_path"],
@@ -134,6 +146,21 @@ def main():
     except Exception:
         pass
 
+    if options["metrics_port"]:
+        serve_metrics(options["metrics_port"])
+    if options["metrics_file"]:
+        write_metrics_file(options["metrics_file"])
+
+    # local catalogue query, does not need the API
+    if options["command"] == "recordings":
+        handle_recordings_table(
+            station=options["recordings_station"],
+            track=options["recordings_track"],
+            date=options["recordings_date"],
+            limit=options["limit"],
+        )
+        sys.exit(0)
+
     handler = Handler()
     alias = Alias()
     alias.generate_map()
@@ -170,6 +197,10 @@ def main():
         alias.remove_entries()
         sys.exit(0)
 
+    if options["check_favorites"]:
+        handle_check_favorites(handler, alias)
+        sys.exit(0)
+
     options["sort_by"] = check_sort_by_parameter(options["sort_by"])
 
     handle_update_screen(app)
@@ -292,7 +323,7 @@ def main():
     # ------------------------- direct play ------------------------#
     if options["direct_play"] is not None:
         options["curr_station_name"], options["target_url"] = handle_direct_play(
-            alias, options["direct_play"]
+            handler, alias, options["direct_play"]
         )
         final_step(options, last_station, alias, handler)
 
@@ -300,7 +331,7 @@ def main():
         (
             options["curr_station_name"],
             options["target_url"],
-        ) = handle_play_random_station(alias)
+        ) = handle_play_random_station(handler, alias)
         final_step(options, last_station, alias, handler)
 
     if options["play_last_station"]:
@@ -323,13 +354,10 @@ def main():
 
 
 def signal_handler(sig, frame):
-    global ffplay
-    global player
     log.debug("You pressed Ctrl+C!")
+    stop_active_recording()
     log.debug("Stopping the radio")
-    if ffplay and ffplay.is_playing:
-        ffplay.stop()
-        #  kill the player
+    if player is not None and player.is_running:
         player.stop()
 
     log.info("Exiting now")
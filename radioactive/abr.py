@@ -0,0 +1,110 @@
+"""Adaptive bitrate: move between variants of a station by measured throughput.
+
+A live stream is sent at its own bitrate, so a healthy connection measures
+about that rate. When the throughput reported by the player stays below
+DOWN_RATIO of the playing variant's bitrate the next lower variant is
+picked. After UP_AFTER seconds without trouble a higher variant is tried
+again; every step down doubles that wait (up to MAX_UP_AFTER). Steps up
+stay within the station's own streams (playlist entries, not same-name
+stations) and need headroom: the peak rate measured on the current stream
+(players fill their cache at link speed) must carry the higher bitrate.
+Variants and their bitrates come from the failover session.
+"""
+
+import threading
+import time
+
+from zenlog import log
+
+from radioactive.metrics import metrics
+
+INTERVAL = 5
+DOWN_RATIO = 0.9
+# consecutive low samples before stepping down
+DOWN_SAMPLES = 3
+UP_AFTER = 300
+MAX_UP_AFTER = 3600
+
+
+class AdaptiveBitrate:
+    """Samples player.throughput() and switches variants when needed"""
+
+    def __init__(self, player, get_session, switch, interval=INTERVAL):
+        self.player = player
+        self.get_session = get_session
+        self.switch = switch
+        self.interval = interval
+        self.up_after = UP_AFTER
+        self.url = None
+        self.low_samples = 0
+        self.next_up = 0.0
+        # highest throughput seen on the current stream
+        self.peak = 0.0
+        self.stop_event = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.tick()
+            except Exception as e:
+                log.debug(f"abr: {e}")
+
+    def tick(self, now=None):
+        """One measurement; returns the URL switched to, if any"""
+        now = now if now is not None else time.time()
+        player = self.player
+        session = self.get_session()
+        if session is None or not player.is_running or player.is_paused:
+            return None
+        if self.url != player.url:
+            # new stream (failover, station change or our own switch)
+            self.url = player.url
+            self.low_samples = 0
+            self.peak = 0.0
+            self.next_up = now + self.up_after
+
+        kbps = session.bitrates.get(player.url)
+        variants = session.variants()
+        if kbps is None or len(variants) < 2:
+            return None
+        rate = player.throughput()
+        if rate is None:
+            return None
+        metrics.set("radioactive_stream_throughput_kbps", round(rate, 1))
+        self.peak = max(self.peak, rate)
+
+        if rate < kbps * DOWN_RATIO:
+            self.low_samples += 1
+            lower = [v for v in variants if v[0] < kbps]
+            if self.low_samples >= DOWN_SAMPLES and lower:
+                self.up_after = min(self.up_after * 2, MAX_UP_AFTER)
+                return self._switch(lower[-1], rate, now)
+            return None
+
+        self.low_samples = 0
+        if now < self.next_up:
+            return None
+        higher = [
+            v
+            for v in session.variants(own=True)
+            if kbps < v[0] <= self.peak * DOWN_RATIO
+        ]
+        if higher:
+            return self._switch(higher[-1], rate, now)
+        return None
+
+    def _switch(self, variant, rate, now):
+        kbps, url = variant
+        log.debug(f"abr: measured {rate:.0f} kbit/s, switching to {kbps} kbit/s {url}")
+        self.switch(url, kbps)
+        self.url = url
+        self.low_samples = 0
+        self.peak = 0.0
+        self.next_up = now + self.up_after
+        return url
@@ -1,96 +1,240 @@
+"""Favourite stations, stored as JSON in ~/.radio-active-favorites.json.
+
+Every entry has a name and uuid_or_url; entries that point to a
+radio-browser station also cache its stream URL, codec, bitrate and tags so
+playing them needs no API round-trip. The old ~/.radio-active-alias file
+(name==uuid_or_url lines) is migrated on first use and left in place.
+"""
+
+import json
 import os.path
+import time
 
 from pick import pick
 from zenlog import log
 
+from radioactive.storage import atomic_write, file_lock
+
+FAVORITES_VERSION = 1
+# radio-browser fields cached with a favourite
+STATION_FIELDS = (
+    "stationuuid",
+    "url",
+    "url_resolved",
+    "codec",
+    "bitrate",
+    "tags",
+    "homepage",
+    "country",
+    "language",
+)
+
+
+def normalize_name(name):
+    """Key used to look favourites up: case and extra spaces do not matter"""
+    return " ".join(name.split()).casefold()
+
+
+def station_metadata(station):
+    """The cached part of a radio-browser station record"""
+    if not isinstance(station, dict):
+        return {}
+    metadata = {
+        key: station[key] for key in STATION_FIELDS if station.get(key) not in (None, "")
+    }
+    metadata["updated"] = int(time.time())
+    return metadata
+
 
 class Alias:
     def __init__(self):
         self.alias_map = []
         self.found = False
+        # lookups by normalised name, station uuid and stream url
+        self.by_name = {}
+        self.by_uuid = {}
+        self.by_url = {}
+        # (inode, mtime_ns, size) of the alias file the map was built from,
+        # every atomic rewrite gets a new inode
+        self.stamp = None
+
+        self.alias_path = os.path.join(
+            os.path.expanduser("~"), ".radio-active-favorites.json"
+        )
+        self.legacy_path = os.path.join(os.path.expanduser("~"), ".radio-active-alias")
 
-        self.alias_path = os.path.join(os.path.expanduser("~"), ".radio-active-alias")
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.alias_path)
+            return (st.st_ino, st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _index(self):
+        self.by_name = {}
+        self.by_uuid = {}
+        self.by_url = {}
+        for entry in self.alias_map:
+            self._index_entry(entry)
+
+    def _index_entry(self, entry):
+        self.by_name.setdefault(normalize_name(entry["name"]), entry)
+        value = entry["uuid_or_url"]
+        if "://" in value:
+            self.by_url.setdefault(value, entry)
+        else:
+            self.by_uuid.setdefault(value, entry)
 
     def write_stations(self, station_map):
-        """Write stations file from generated map"""
-        with open(self.alias_path, "w") as f:
-            f.flush()
-            for entry in station_map:
-                f.write(
-                    "{}=={}\n".format(
-                        entry["name"].strip(), entry["uuid_or_url"].strip()
-                    )
-                )
+        """Write stations file from generated map (atomically)"""
+        stations = []
+        for entry in station_map:
+            entry = dict(entry)
+            entry["name"] = entry["name"].strip()
+            entry["uuid_or_url"] = entry["uuid_or_url"].strip()
+            stations.append(entry)
+        atomic_write(
+            self.alias_path,
+            json.dumps({"version": FAVORITES_VERSION, "stations": stations}, indent=1),
+        )
+        self.alias_map = stations
+        self._index()
+        self.stamp = self._file_stamp()
         return True
 
+    def _migrate(self):
+        """Convert the old name==uuid_or_url file, once"""
+        with file_lock(self.alias_path):
+            if os.path.exists(self.alias_path) or not os.path.exists(self.legacy_path):
+                return
+            stations = self._parse_legacy()
+            self.write_stations(stations)
+            log.debug(f"Migrated {len(stations)} favourites to {self.alias_path}")
+
     def generate_map(self):
-        """parses the fav list file and generates a list"""
-        # create alias map
-        self.alias_map = []
+        """Loads the favourites JSON into alias_map and the lookup indexes.
+        Migrates the old ~/.radio-active-alias file when there is no JSON
+        yet; nothing is re-read while the file is unchanged.
+        """
+        stamp = self._file_stamp()
+        if stamp is None and os.path.exists(self.legacy_path):
+            self._migrate()
+            stamp = self._file_stamp()
+        if stamp is None:
+            log.debug("Alias file does not exist")
+            self.alias_map = []
+            self.stamp = None
+            self._index()
+            return
+        if stamp == self.stamp:
+            return
 
-        if os.path.exists(self.alias_path):
-            log.debug(f"Alias file at: {self.alias_path}")
-            try:
-                with open(self.alias_path, "r+") as f:
-                    alias_data = f.read().strip()
-                    if alias_data == "":
-                        log.debug("Empty alias list")
-                        return
-                    alias_list = alias_data.splitlines()
-                    for alias in alias_list:
-                        if alias.strip() == "":
-                            # empty line pass
-                            continue
-                        temp = alias.split("==")
-                        left = temp[0]
-                        right = temp[1]
-                        # may contain both URL and UUID
-                        self.alias_map.append({"name": left, "uuid_or_url": right})
-            except Exception as e:
-                log.debug(f"could not get / parse alias data: {e}")
+        log.debug(f"Alias file at: {self.alias_path}")
+        self.stamp = stamp
+        self.alias_map = self._parse()
+        self._index()
 
-        else:
-            log.debug("Alias file does not exist")
+    def _parse(self):
+        try:
+            with open(self.alias_path, "r") as f:
+                data = json.load(f)
+            return [
+                entry
+                for entry in data.get("stations", [])
+                if entry.get("name") and entry.get("uuid_or_url")
+            ]
+        except Exception as e:
+            log.debug(f"could not get / parse alias data: {e}")
+        return []
+
+    def _parse_legacy(self):
+        alias_map = []
+        try:
+            with open(self.legacy_path, "r") as f:
+                alias_data = f.read().strip()
+            if alias_data == "":
+                log.debug("Empty alias list")
+                return alias_map
+            for alias in alias_data.splitlines():
+                if alias.strip() == "":
+                    # empty line pass
+                    continue
+                left, right = alias.split("==", 1)
+                # may contain both URL and UUID
+                alias_map.append({"name": left.strip(), "uuid_or_url": right.strip()})
+        except Exception as e:
+            log.debug(f"could not get / parse alias data: {e}")
+        return alias_map
 
     def search(self, entry):
         """searches for an entry in the fav list with the name
         the right side may contain both url or uuid , need to check properly
         """
         log.debug("Alias search: {}".format(entry))
-        if len(self.alias_map) > 0:
-            log.debug("looking under alias file")
-            for alias in self.alias_map:
-                if alias["name"].strip() == entry.strip():
-                    log.debug(
-                        "Alias found: {} == {}".format(
-                            alias["name"], alias["uuid_or_url"]
-                        )
-                    )
-                    self.found = True
-                    return alias
-
+        alias = self.by_name.get(normalize_name(entry))
+        if alias is None:
             log.debug("Alias not found")
-        else:
-            log.debug("Empty Alias file")
-        return None
+            return None
+        log.debug("Alias found: {} == {}".format(alias["name"], alias["uuid_or_url"]))
+        self.found = True
+        return alias
 
-    def add_entry(self, left, right):
-        """Adds a new entry to the fav list"""
-        self.generate_map()
-        if self.search(left) is not None:
-            log.warning("An entry with same name already exists, try another name")
-            return False
-        else:
-            with open(self.alias_path, "a+") as f:
-                f.write("{}=={}\n".format(left.strip(), right.strip()))
-                log.info("Current station added to your favorite list")
-            return True
+    def search_uuid(self, uuid):
+        return self.by_uuid.get(uuid.strip())
+
+    def search_url(self, url):
+        return self.by_url.get(url.strip())
+
+    def add_entry(self, left, right, metadata=None):
+        """Adds a new entry to the fav list, metadata from station_metadata()"""
+        # re-read under the lock, another instance may have added entries
+        with file_lock(self.alias_path):
+            self.generate_map()
+            if self.search(left) is not None:
+                log.warning("An entry with same name already exists, try another name")
+                return False
+            entry = {"name": left.strip(), "uuid_or_url": right.strip()}
+            entry.update(metadata or {})
+            self.write_stations(self.alias_map + [entry])
+        log.info("Current station added to your favorite list")
+        return True
+
+    def update_entry(self, name, metadata):
+        """Refresh the cached station data of a favourite"""
+        return self.update_entries({name: metadata}) > 0
+
+    def update_entries(self, updates):
+        """Merge fields into several favourites at once, {name: fields}"""
+        updates = {normalize_name(name): fields for name, fields in updates.items()}
+        with file_lock(self.alias_path):
+            self.generate_map()
+            changed = 0
+            stations = []
+            for entry in self.alias_map:
+                fields = updates.pop(normalize_name(entry["name"]), None)
+                if fields is not None:
+                    entry = dict(entry, **fields)
+                    changed += 1
+                stations.append(entry)
+            if changed:
+                self.write_stations(stations)
+        return changed
+
+    def stale_entries(self, max_age):
+        """Favourites pointing to a station uuid whose cache is older than max_age"""
+        now = time.time()
+        return [
+            entry
+            for entry in self.alias_map
+            if "://" not in entry["uuid_or_url"]
+            and now - entry.get("updated", 0) > max_age
+        ]
 
     def flush(self):
         """deletes all the entries in the fav list"""
         try:
-            with open(self.alias_path, "w") as f:
-                f.flush()
+            with file_lock(self.alias_path):
+                self.write_stations([])
             log.info("All entries deleted in your favorite list")
             return 0
         except Exception as e:
@@ -115,17 +259,23 @@ class Alias:
         # Extract integer numbers and create a new list
         indices_to_remove = [item[1] for item in selected if isinstance(item[1], int)]
 
-        # remove selected entries from the map, and regenerate
-        filtered_list = [
-            self.alias_map[i]
-            for i in range(len(self.alias_map))
-            if i not in indices_to_remove
+        # remove selected entries from the current file content, so entries
+        # added meanwhile by another instance survive
+        removed = [
+            (self.alias_map[i]["name"], self.alias_map[i]["uuid_or_url"])
+            for i in indices_to_remove
         ]
+        with file_lock(self.alias_path):
+            self.generate_map()
+            filtered_list = [
+                entry
+                for entry in self.alias_map
+                if (entry["name"], entry["uuid_or_url"]) not in removed
+            ]
 
-        log.debug(
-            f"Current # of entries reduced to : {len(filtered_list)} from {len(self.alias_map)}"
-        )
+            log.debug(
+                f"Current # of entries reduced to : {len(filtered_list)} from {len(self.alias_map)}"
+            )
 
-        self.write_stations(filtered_list)
-        self.alias_map = filtered_list
+            self.write_stations(filtered_list)
         log.info("Stations removed successfully!")
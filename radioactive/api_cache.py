@@ -0,0 +1,128 @@
+"""HTTP cache of the radio-browser API (requests_cache).
+
+The cache lives in the user cache directory (~/.cache/radio-active.sqlite
+on Linux) instead of the working directory. Every endpoint has its own
+lifetime: lists of countries, languages and tags change rarely, search
+results within hours, a single station within minutes, and clicks and
+votes are never cached (they would not be counted). When the database
+grows beyond API_CACHE_MAX_SIZE, expired and then the soonest-expiring
+responses are evicted. Expired searches and lists are served while they
+are refreshed in the background. Every lookup is counted as a cache hit or
+miss.
+"""
+
+import atexit
+import datetime
+
+import requests_cache
+from zenlog import log
+
+from radioactive.metrics import metrics
+
+API_CACHE_NAME = "radio-active"
+API_CACHE_MAX_SIZE = 50 * 1024 * 1024
+
+# first matching pattern wins, anything else is kept for a day
+API_CACHE_POLICIES = {
+    "*/json/url/*": requests_cache.DO_NOT_CACHE,
+    "*/json/vote/*": requests_cache.DO_NOT_CACHE,
+    "*/json/countries": datetime.timedelta(weeks=4),
+    "*/json/countrycodes": datetime.timedelta(weeks=4),
+    "*/json/states": datetime.timedelta(weeks=4),
+    "*/json/languages": datetime.timedelta(weeks=4),
+    "*/json/tags": datetime.timedelta(weeks=1),
+    "*/json/stations/byuuid": datetime.timedelta(minutes=10),
+    "*/json/stations": datetime.timedelta(hours=6),
+}
+API_CACHE_DEFAULT = datetime.timedelta(days=1)
+# an expired response younger than this is served at once and refreshed in
+# the background, so a repeated search never waits on the network
+API_CACHE_STALE = datetime.timedelta(days=7)
+# only searches and lists may be stale; a single station (favourite refresh,
+# health check) is always fetched again once it expired
+API_CACHE_STALE_ENDPOINTS = (
+    "stations/search",
+    "countries",
+    "countrycodes",
+    "states",
+    "languages",
+    "tags",
+)
+
+
+def api_endpoint(url):
+    """/json/stations/byuuid/<uuid> -> stations/byuuid, ids left out"""
+    parts = [p for p in url.split("?")[0].split("/")[3:] if p]
+    if parts and parts[0] == "json":
+        parts = parts[1:]
+    return "/".join(p for p in parts[:2] if len(p) != 36)
+
+
+def _observe_response(response, *args, **kwargs):
+    # requests_cache may run the hooks of a fresh response twice
+    if getattr(response, "_radioactive_observed", False):
+        return
+    response._radioactive_observed = True
+    from_cache = getattr(response, "from_cache", False)
+    endpoint = api_endpoint(response.url)
+    metrics.cache("api", from_cache)
+    if from_cache:
+        log.debug(f"api {endpoint}: cache hit")
+    else:
+        elapsed = response.elapsed.total_seconds()
+        metrics.observe("radioactive_api_request_seconds", elapsed, endpoint=endpoint)
+        log.debug(f"api {endpoint}: cache miss, {elapsed * 1000:.0f} ms")
+
+
+def evict(cache, max_size=API_CACHE_MAX_SIZE):
+    """Shrink the cache database below max_size"""
+    responses = cache.responses
+    if responses.size() <= max_size:
+        return
+    cache.delete(expired=True)
+    while responses.size() > max_size:
+        count = len(responses)
+        if count == 0:
+            break
+        # responses about to expire are the least valuable
+        keys = [r.cache_key for r in responses.sorted(limit=max(count // 4, 1))]
+        cache.delete(*keys)
+        responses.vacuum()
+    log.debug(f"API cache evicted down to {responses.size()} bytes")
+
+
+def log_stats():
+    hits = metrics.get("radioactive_cache_requests_total", cache="api", result="hit")
+    misses = metrics.get("radioactive_cache_requests_total", cache="api", result="miss")
+    if hits or misses:
+        rate = 100 * hits / (hits + misses)
+        log.debug(f"API cache: {hits} hits, {misses} misses ({rate:.0f}% hit rate)")
+
+
+class APISession(requests_cache.CachedSession):
+    """Asks for stale-while-revalidate on the endpoints that allow it"""
+
+    def request(self, method, url, *args, headers=None, **kwargs):
+        if api_endpoint(url) in API_CACHE_STALE_ENDPOINTS:
+            stale = int(API_CACHE_STALE.total_seconds())
+            headers = dict(headers or {})
+            headers["Cache-Control"] = f"stale-while-revalidate={stale}"
+        return super().request(method, url, *args, headers=headers, **kwargs)
+
+
+def make_session():
+    """Cached requests session for the radio-browser client"""
+    session = APISession(
+        cache_name=API_CACHE_NAME,
+        backend="sqlite",
+        use_cache_dir=True,
+        expire_after=API_CACHE_DEFAULT,
+        urls_expire_after=API_CACHE_POLICIES,
+    )
+    try:
+        evict(session.cache)
+    except Exception as e:
+        log.debug(f"API cache eviction failed: {e}")
+    session.hooks["response"].append(_observe_response)
+    atexit.register(log_stats)
+    return session
@@ -29,6 +29,14 @@ class Parser:
             add_help=False,
         )
 
+        self.parser.add_argument(
+            "command",
+            nargs="?",
+            choices=["recordings"],
+            default=None,
+            help="'recordings' lists your recordings (see --station/--track/--date)",
+        )
+
         self.parser.add_argument(
             "--version", action="store_true", dest="version", default=False
         )
@@ -89,6 +97,31 @@ class Parser:
             help="Specify log level",
         )
 
+        self.parser.add_argument(
+            "--trace-file",
+            action="store",
+            dest="trace_file",
+            default=None,
+            help="Write start-up timing spans to a file (.json: Chrome trace)",
+        )
+
+        self.parser.add_argument(
+            "--metrics-port",
+            action="store",
+            dest="metrics_port",
+            default=None,
+            type=int,
+            help="Serve Prometheus metrics on 127.0.0.1:PORT/metrics",
+        )
+
+        self.parser.add_argument(
+            "--metrics-file",
+            action="store",
+            dest="metrics_file",
+            default=None,
+            help="Write Prometheus metrics to a file every 10 seconds",
+        )
+
         self.parser.add_argument(
             "--country",
             "-C",
@@ -183,6 +216,14 @@ class Parser:
             help="Flush your favorite list",
         )
 
+        self.parser.add_argument(
+            "--check-favorites",
+            action="store_true",
+            dest="check_favorites",
+            default=False,
+            help="Check which of your favorite stations are reachable",
+        )
+
         self.parser.add_argument(
             "--volume",
             "-V",
@@ -200,7 +241,7 @@ class Parser:
             action="store_true",
             dest="kill_ffplays",
             default=False,
-            help="kill all the ffplay process initiated by radioactive",
+            help="kill the players and recorders started by radioactive",
         )
 
         self.parser.add_argument(
@@ -238,12 +279,36 @@ class Parser:
             help="specify the audio format for recording. auto/mp3",
         )
 
+        self.parser.add_argument(
+            "--station",
+            action="store",
+            dest="recordings_station",
+            default=None,
+            help="radio recordings: filter by station name or UUID",
+        )
+
+        self.parser.add_argument(
+            "--track",
+            action="store",
+            dest="recordings_track",
+            default=None,
+            help="radio recordings: filter by a track title heard in the recording",
+        )
+
+        self.parser.add_argument(
+            "--date",
+            action="store",
+            dest="recordings_date",
+            default=None,
+            help="radio recordings: filter by recording date (YYYY-MM-DD)",
+        )
+
         self.parser.add_argument(
             "--player",
             action="store",
             dest="audio_player",
             default=self.defaults["player"],
-            help="specify the audio player to use. ffplay/vlc/mpv",
+            help="specify the audio player to use. ffplay/vlc/mpv/embedded",
         )
 
         # Always force MP3 when recording (configurable)
@@ -255,6 +320,21 @@ class Parser:
             help="Always record using mp3 (overrides auto codec)",
         )
 
+        self.parser.add_argument(
+            "--postprocess",
+            action="store_true",
+            dest="postprocess",
+            default=self.defaults.get("postprocess", False),
+            help="Record with stream copy, transcode/normalise/tag after stopping",
+        )
+        self.parser.add_argument(
+            "--no-postprocess",
+            action="store_false",
+            dest="postprocess",
+            default=self.defaults.get("postprocess", False),
+            help="Record straight to the target format (overrides the config)",
+        )
+
     def parse(self):
         self.result = self.parser.parse_args()
         if self.result is None:
@@ -0,0 +1,175 @@
+"""SQLite catalogue of recordings, so finding a show does not mean
+scanning the recordings directory"""
+
+import datetime
+import os
+import sqlite3
+import threading
+import time
+
+from zenlog import log
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    id INTEGER PRIMARY KEY,
+    station_uuid TEXT,
+    station_name TEXT NOT NULL,
+    url TEXT,
+    codec TEXT,
+    path TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    stopped_at REAL,
+    duration REAL,
+    size INTEGER
+);
+CREATE TABLE IF NOT EXISTS tracks (
+    recording_id INTEGER NOT NULL REFERENCES recordings(id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    at_seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_recordings_station
+    ON recordings(station_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_recordings_uuid ON recordings(station_uuid);
+CREATE INDEX IF NOT EXISTS idx_recordings_started ON recordings(started_at);
+CREATE INDEX IF NOT EXISTS idx_tracks_recording ON tracks(recording_id);
+CREATE INDEX IF NOT EXISTS idx_tracks_title ON tracks(title COLLATE NOCASE);
+"""
+
+
+def parse_elapsed(value):
+    """ffmpeg out_time (HH:MM:SS.micro) to seconds"""
+    try:
+        hours, minutes, seconds = value.split(":")
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except Exception:
+        return None
+
+
+class RecordingCatalog:
+    """Tracks every recording with its station, file and the titles heard"""
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(
+            os.path.expanduser("~"), ".radio-active-recordings.db"
+        )
+        self._conn = None
+        # the UI, title worker and post-processing callbacks all write here
+        self._lock = threading.Lock()
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def start(self, station_name, url, path, station_uuid=None, codec=None):
+        """Register a recording that just started, returns its id"""
+        with self._lock, self._db() as db:
+            cur = db.execute(
+                "INSERT INTO recordings"
+                " (station_uuid, station_name, url, codec, path, started_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (station_uuid, station_name, url, codec, path, time.time()),
+            )
+            return cur.lastrowid
+
+    def add_track(self, recording_id, title):
+        with self._lock, self._db() as db:
+            started_at = db.execute(
+                "SELECT started_at FROM recordings WHERE id = ?", (recording_id,)
+            ).fetchone()
+            if started_at is None:
+                return
+            db.execute(
+                "INSERT INTO tracks (recording_id, title, at_seconds) VALUES (?, ?, ?)",
+                (recording_id, title, time.time() - started_at[0]),
+            )
+
+    def stop(self, recording_id, duration=None):
+        """Mark a recording as finished, size is read from the file"""
+        with self._lock, self._db() as db:
+            row = db.execute(
+                "SELECT path, started_at FROM recordings WHERE id = ?",
+                (recording_id,),
+            ).fetchone()
+            if row is None:
+                return
+            now = time.time()
+            db.execute(
+                "UPDATE recordings SET stopped_at = ?, duration = ?, size = ?"
+                " WHERE id = ?",
+                (
+                    now,
+                    duration if duration is not None else now - row["started_at"],
+                    _file_size(row["path"]),
+                    recording_id,
+                ),
+            )
+
+    def update_path(self, recording_id, path, codec=None):
+        """Point an entry to a new file, e.g. after post-processing"""
+        with self._lock, self._db() as db:
+            db.execute(
+                "UPDATE recordings SET path = ?, size = ?,"
+                " codec = COALESCE(?, codec) WHERE id = ?",
+                (path, _file_size(path), codec, recording_id),
+            )
+
+    def search(self, station=None, track=None, date=None, limit=100):
+        """Newest first. station/track are substring matches, date is YYYY-MM-DD"""
+        where = []
+        params = []
+        if station:
+            where.append("(r.station_name LIKE ? OR r.station_uuid = ?)")
+            params += [f"%{station}%", station]
+        if date:
+            day = datetime.datetime.strptime(date, "%Y-%m-%d")
+            start = time.mktime(day.timetuple())
+            end = time.mktime((day + datetime.timedelta(days=1)).timetuple())
+            where.append("r.started_at >= ? AND r.started_at < ?")
+            params += [start, end]
+        if track:
+            where.append("r.id IN (SELECT recording_id FROM tracks WHERE title LIKE ?)")
+            params.append(f"%{track}%")
+
+        query = "SELECT r.* FROM recordings r"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY r.started_at DESC LIMIT ?"
+        params.append(int(limit))
+
+        with self._lock:
+            db = self._db()
+            rows = [dict(row) for row in db.execute(query, params)]
+            for row in rows:
+                row["tracks"] = [
+                    t["title"]
+                    for t in db.execute(
+                        "SELECT title FROM tracks WHERE recording_id = ?"
+                        " ORDER BY at_seconds",
+                        (row["id"],),
+                    )
+                ]
+        return rows
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+recording_catalog = RecordingCatalog()
+
+
+def catalog_call(method, *args, **kwargs):
+    """Run a catalogue update, never let it break recording"""
+    try:
+        return getattr(recording_catalog, method)(*args, **kwargs)
+    except Exception as e:
+        log.debug(f"recording catalog: {method} failed: {e}")
+        return None
@@ -0,0 +1,138 @@
+"""Station click reporting to radio-browser, off the playback path.
+
+Clicks are queued and sent by a background thread, at most one per station
+per session. Whatever is queued at once goes out as one batch; clicks that
+can not be sent (offline, API down) are kept in ~/.radio-active-clicks and
+retried after the next successful send or on the next start. Pending clicks
+older than PENDING_TTL are dropped, the API only counts one click per
+station and client a day anyway.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+
+from zenlog import log
+
+from radioactive import tracing
+from radioactive.storage import read_json, update_json
+
+PENDING_TTL = 24 * 60 * 60
+
+
+class ClickQueue:
+    def __init__(self, path=None):
+        self.path = path or os.path.join(
+            os.path.expanduser("~"), ".radio-active-clicks"
+        )
+        self.queue = queue.Queue()
+        # stations clicked (or queued) in this session
+        self.seen = set()
+        # clicks waiting in the queue or being sent right now
+        self.queued = set()
+        self.send = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self, send):
+        """Start sending with send(uuid); retries what was left pending"""
+        self.send = send
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        atexit.register(self._save_unsent)
+        for uuid in self._pending():
+            self.submit(uuid)
+
+    def submit(self, uuid):
+        """Queue a click for uuid, False if it was already counted"""
+        uuid = (uuid or "").strip()
+        with self.lock:
+            if not uuid or uuid in self.seen:
+                return False
+            self.seen.add(uuid)
+            self.queued.add(uuid)
+        self.queue.put(uuid)
+        return True
+
+    def _retry(self, uuid):
+        """Queue a pending click again unless it is already on its way"""
+        with self.lock:
+            if uuid in self.queued:
+                return
+            self.queued.add(uuid)
+        self.queue.put(uuid)
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._send_batch(batch)
+            finally:
+                with self.lock:
+                    self.queued.difference_update(batch)
+
+    def _send_batch(self, batch):
+        sent, failed = [], []
+        for uuid in batch:
+            try:
+                with tracing.span("click", uuid=uuid):
+                    self.send(uuid)
+                sent.append(uuid)
+            except Exception as e:
+                log.debug(f"Click for {uuid} not sent: {e}")
+                failed.append(uuid)
+        if failed and sent:
+            # the API answers again, but the failed ones stay for later
+            log.debug(f"{len(failed)} clicks kept for retry")
+        self._update_pending(sent, failed)
+        if sent and not failed:
+            # back online: retry what earlier sessions could not send
+            for uuid in self._pending():
+                self._retry(uuid)
+
+    def _pending(self):
+        now = time.time()
+        pending = read_json(self.path, {})
+        if not isinstance(pending, dict):
+            return []
+        return [uuid for uuid, ts in pending.items() if now - ts < PENDING_TTL]
+
+    def _update_pending(self, sent, failed):
+        if not os.path.exists(self.path) and not failed:
+            return
+        now = time.time()
+
+        def _update(pending):
+            for uuid in sent:
+                pending.pop(uuid, None)
+            for uuid in failed:
+                pending.setdefault(uuid, now)
+            for uuid in [u for u, ts in pending.items() if now - ts >= PENDING_TTL]:
+                del pending[uuid]
+
+        try:
+            update_json(self.path, _update)
+        except Exception as e:
+            log.debug(f"Could not save pending clicks: {e}")
+
+    def _save_unsent(self):
+        unsent = []
+        while True:
+            try:
+                unsent.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if unsent:
+            self._update_pending([], unsent)
+
+
+click_queue = ClickQueue()
@@ -2,11 +2,20 @@
 # If any options are given on command line it will override the configs
 import configparser
 import getpass
+import io
 import os
 import sys
 
 from zenlog import log
 
+from radioactive.storage import atomic_write, file_lock
+
+
+def _config_text(config):
+    buffer = io.StringIO()
+    config.write(buffer)
+    return buffer.getvalue()
+
 
 def write_a_sample_config_file():
     # Create a ConfigParser object
@@ -24,6 +33,10 @@ def write_a_sample_config_file():
         "player": "ffplay",
         "force_mp3": "false",
         "theme": "classic",
+        "postprocess": "false",
+        "postprocess_workers": "1",
+        "postprocess_nice": "10",
+        "postprocess_loudnorm": "true",
     }
 
     # Get the user's home directory
@@ -34,8 +47,7 @@ def write_a_sample_config_file():
 
     try:
         # Write the configuration to the file
-        with open(file_path, "w") as config_file:
-            config.write(config_file)
+        atomic_write(file_path, _config_text(config))
 
         log.info(f"A sample default configuration file added at: {file_path}")
 
@@ -79,6 +91,19 @@ class Configs:
             except Exception:
                 force_val = "false"
             options["force_mp3"] = str(force_val).strip().lower() in ["1", "true", "yes", "on"]
+            # Optional: record with stream copy, transcode/normalise/tag afterwards
+            options["postprocess"] = self._optional(
+                self.config.getboolean, "postprocess", False
+            )
+            options["postprocess_workers"] = self._optional(
+                self.config.getint, "postprocess_workers", 1
+            )
+            options["postprocess_nice"] = self._optional(
+                self.config.getint, "postprocess_nice", 10
+            )
+            options["postprocess_loudnorm"] = self._optional(
+                self.config.getboolean, "postprocess_loudnorm", True
+            )
 
             return options
 
@@ -89,17 +114,25 @@ class Configs:
             log.info("Re-run radioative")
             sys.exit(1)
 
+    def _optional(self, parse, key, default):
+        """Optional AppConfig key, the default if it is missing or malformed"""
+        try:
+            return parse("AppConfig", key, fallback=default)
+        except ValueError:
+            log.warning(f"Invalid {key} in the config file, using {default}")
+            return default
+
     def set_theme(self, theme_name: str) -> bool:
         """Persist theme under AppConfig.theme; create file if needed."""
         try:
-            cfg = configparser.ConfigParser()
-            if os.path.exists(self.config_path):
-                cfg.read(self.config_path)
-            if "AppConfig" not in cfg:
-                cfg["AppConfig"] = {}
-            cfg["AppConfig"]["theme"] = str(theme_name)
-            with open(self.config_path, "w") as f:
-                cfg.write(f)
+            with file_lock(self.config_path):
+                cfg = configparser.ConfigParser()
+                if os.path.exists(self.config_path):
+                    cfg.read(self.config_path)
+                if "AppConfig" not in cfg:
+                    cfg["AppConfig"] = {}
+                cfg["AppConfig"]["theme"] = str(theme_name)
+                atomic_write(self.config_path, _config_text(cfg))
             return True
         except Exception:
             return False
@@ -0,0 +1,378 @@
+"""In-process player: decode the stream once with PyAV and fan the PCM out.
+
+One connection and one decoder feed the audio device, the VU meter and an
+optional recorder at the same time, instead of separate ffplay/ffmpeg
+processes each opening the stream. Needs the optional dependencies:
+
+    pip install radio-active[embedded]   # av, sounddevice
+
+Use output="null" to decode without an audio device (tests, benchmarks).
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+import warnings
+from array import array
+
+from zenlog import log
+
+from radioactive.player import PlayerBackend, register_backend
+from radioactive.postprocess import ENCODERS
+from radioactive.progress import make_snapshot, progress_store
+from radioactive.supervisor import PlayerEvent
+
+try:
+    import av  # type: ignore
+except ImportError:
+    av = None
+
+try:
+    import sounddevice  # type: ignore
+except Exception:
+    # not installed, or PortAudio is missing
+    sounddevice = None
+
+try:
+    import numpy  # type: ignore
+except ImportError:
+    numpy = None
+
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop  # removed in Python 3.13
+except ImportError:
+    audioop = None
+
+SAMPLE_RATE = 44100
+CHANNELS = 2
+BYTES_PER_FRAME = 2 * CHANNELS  # s16 interleaved
+
+
+def apply_gain(pcm, gain):
+    """Scale s16 PCM by gain, clipped to the sample range"""
+    if numpy is not None:
+        samples = numpy.frombuffer(pcm, dtype=numpy.int16) * gain
+        return numpy.clip(samples, -32768, 32767).astype(numpy.int16).tobytes()
+    if audioop is not None:
+        return audioop.mul(pcm, 2, gain)
+    samples = array("h", pcm)
+    for i, value in enumerate(samples):
+        samples[i] = max(-32768, min(32767, int(value * gain)))
+    return samples.tobytes()
+
+
+class NullSink:
+    """Swallows PCM, used when there is no audio device"""
+
+    def write(self, pcm, frame):
+        pass
+
+    def close(self):
+        pass
+
+
+class SoundDeviceSink:
+    """Plays PCM on the default output device"""
+
+    def __init__(self):
+        self.gain = 1.0
+        self.muted = False
+        self.stream = sounddevice.RawOutputStream(
+            samplerate=SAMPLE_RATE, channels=CHANNELS, dtype="int16"
+        )
+        self.stream.start()
+
+    def write(self, pcm, frame):
+        if self.muted:
+            return
+        if self.gain != 1.0:
+            pcm = apply_gain(pcm, self.gain)
+        self.stream.write(pcm)
+
+    def close(self):
+        try:
+            self.stream.stop()
+            self.stream.close()
+        except Exception:
+            pass
+
+
+class LevelSink:
+    """Reports the RMS level in dBFS a few times per second"""
+
+    # looking at every 8th sample is plenty for a meter
+    stride = 8
+
+    def __init__(self, callback, interval=0.25):
+        self.callback = callback
+        self.interval = interval
+        self.power = 0
+        self.count = 0
+        self.last = 0.0
+
+    def write(self, pcm, frame):
+        samples = array("h", pcm)[:: self.stride]
+        self.power += sum(v * v for v in samples)
+        self.count += len(samples)
+        now = time.time()
+        if not self.count or now - self.last < self.interval:
+            return
+        rms = math.sqrt(self.power / self.count)
+        self.power = self.count = 0
+        self.last = now
+        self.callback(20 * math.log10(rms / 32768) if rms else -90.0)
+
+    def close(self):
+        pass
+
+
+class EncoderSink:
+    """Encodes the decoded PCM to a file.
+
+    Looks like a recorder process (poll/terminate/wait/kill) so the
+    recording code can treat it like an ffmpeg recorder.
+    """
+
+    stdout = None
+
+    def __init__(self, player, output_file):
+        self.player = player
+        self.output_file = output_file
+        ext = os.path.splitext(output_file)[1].lstrip(".").lower()
+        self.container = av.open(output_file, "w")
+        self.stream = self.container.add_stream(
+            ENCODERS.get(ext, "libmp3lame"), rate=SAMPLE_RATE
+        )
+        self.stream.layout = "stereo"
+        self.resampler = None
+        self.samples = 0
+        self.started = time.time()
+        self.returncode = None
+        self.lock = threading.Lock()
+
+    def write(self, pcm, frame):
+        with self.lock:
+            if self.returncode is not None:
+                return
+            if self.resampler is None:
+                self.resampler = av.AudioResampler(
+                    format=self.stream.codec_context.format.name,
+                    layout="stereo",
+                    rate=SAMPLE_RATE,
+                )
+            frame.pts = None
+            for out in self.resampler.resample(frame):
+                for packet in self.stream.encode(out):
+                    self.container.mux(packet)
+            self.samples += frame.samples
+            self._publish()
+
+    def _publish(self, finished=False):
+        elapsed = self.samples / SAMPLE_RATE
+        size = 0
+        try:
+            size = os.path.getsize(self.output_file)
+        except OSError:
+            pass
+        wall = max(time.time() - self.started, 1e-6)
+        hours, rest = divmod(elapsed, 3600)
+        minutes, seconds = divmod(rest, 60)
+        block = {
+            "out_time": f"{int(hours):02d}:{int(minutes):02d}:{seconds:09.6f}",
+            "total_size": str(size),
+            "bitrate": f"{size * 8 / 1000 / elapsed:.1f}kbits/s" if elapsed else "N/A",
+            "speed": f"{elapsed / wall:.2f}x",
+        }
+        progress_store.publish(self.output_file, make_snapshot(block, finished))
+
+    # recorder process interface
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        self.player.remove_sink(self)
+        with self.lock:
+            if self.returncode is not None:
+                return
+            try:
+                for packet in self.stream.encode(None):
+                    self.container.mux(packet)
+                self.container.close()
+            except Exception as e:
+                log.debug(f"embedded recorder: {e}")
+            self.returncode = 0
+            self._publish(finished=True)
+
+    kill = close = terminate
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+
+@register_backend("embedded")
+class EmbeddedPlayer(PlayerBackend):
+    name = "embedded"
+    supports_pause_without_reconnect = True
+    supports_switch_without_restart = True
+    # VU levels and recordings come from our own decoded PCM
+    supports_pcm_tap = True
+
+    def __init__(self, volume=None, loglevel="info", output=None):
+        super().__init__(volume, loglevel)
+        self.program_name = "embedded"
+        if av is None:
+            log.critical(
+                "PyAV not found, install it with: pip install radio-active[embedded]"
+            )
+            sys.exit(1)
+        if output != "null" and sounddevice is None:
+            log.critical(
+                "sounddevice not found, install it with: pip install radio-active[embedded]"
+            )
+            sys.exit(1)
+        self.output = output
+        self.audio_sink = None
+        self.sinks = []
+        self.sinks_lock = threading.Lock()
+        self.container = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.bytes_received = 0
+        self.first_audio_time = None
+        self._rate_sample = None
+
+    def _make_audio_sink(self):
+        if self.output == "null":
+            return NullSink()
+        sink = SoundDeviceSink()
+        if self.volume is not None:
+            sink.gain = int(self.volume) / 100
+        return sink
+
+    def add_sink(self, sink):
+        with self.sinks_lock:
+            self.sinks.append(sink)
+
+    def remove_sink(self, sink):
+        with self.sinks_lock:
+            if sink in self.sinks:
+                self.sinks.remove(sink)
+
+    def record_to(self, output_file):
+        """Start encoding the decoded stream to output_file"""
+        sink = EncoderSink(self, output_file)
+        self.add_sink(sink)
+        return sink
+
+    def start(self, url):
+        self.url = url
+        self.stop_event = threading.Event()
+        if self.audio_sink is None:
+            self.audio_sink = self._make_audio_sink()
+        if hasattr(self.audio_sink, "muted"):
+            self.audio_sink.muted = False
+        self.is_running = True
+        self.is_paused = False
+        self.first_audio_time = None
+        self.audio_started = False
+        self.thread = threading.Thread(
+            target=self._decode, args=(url, self.stop_event), daemon=True
+        )
+        self.thread.start()
+        log.debug(f"player: {self.program_name} => decoding {url}")
+
+    def _decode(self, url, stop_event):
+        reason = "stream ended"
+        container = None
+        try:
+            container = av.open(url, timeout=10)
+            self.container = container
+            stream = container.streams.audio[0]
+            resampler = av.AudioResampler(
+                format="s16", layout="stereo", rate=SAMPLE_RATE
+            )
+            for packet in container.demux(stream):
+                if stop_event.is_set():
+                    break
+                self.bytes_received += packet.size
+                for frame in packet.decode():
+                    for out in resampler.resample(frame):
+                        self._fan_out(out)
+        except Exception as e:
+            reason = str(e)
+        finally:
+            if container is not None:
+                try:
+                    container.close()
+                except Exception:
+                    pass
+            if not stop_event.is_set():
+                self._crashed(PlayerEvent("crash", reason, None, time.time()))
+
+    def throughput(self):
+        """kbit/s received since the previous call"""
+        sample = (time.time(), self.bytes_received)
+        last, self._rate_sample = self._rate_sample, sample
+        if last is None or sample[0] <= last[0] or sample[1] < last[1]:
+            return None
+        return (sample[1] - last[1]) * 8 / 1000 / (sample[0] - last[0])
+
+    def is_alive(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def _fan_out(self, frame):
+        pcm = bytes(frame.planes[0])[: frame.samples * BYTES_PER_FRAME]
+        if self.first_audio_time is None:
+            self.first_audio_time = time.time()
+            self._audio_started()
+        with self.sinks_lock:
+            sinks = [self.audio_sink] + self.sinks
+        for sink in sinks:
+            try:
+                sink.write(pcm, frame)
+            except Exception as e:
+                log.debug(f"embedded sink {type(sink).__name__}: {e}")
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+            self.thread = None
+        self.is_running = False
+        self.is_paused = False
+
+    def pause(self):
+        # keep decoding (recording and VU continue), only silence the output
+        if hasattr(self.audio_sink, "muted"):
+            self.audio_sink.muted = True
+            self.is_paused = True
+            return True
+        return super().pause()
+
+    def resume(self):
+        if self.is_running and hasattr(self.audio_sink, "muted"):
+            self.audio_sink.muted = False
+            self.is_paused = False
+            return True
+        return super().resume()
+
+    def set_volume(self, volume):
+        self.volume = volume
+        if hasattr(self.audio_sink, "gain"):
+            self.audio_sink.gain = int(volume) / 100
+        return True
+
+    def switch(self, url):
+        # same process and audio device, only the input changes
+        self.stop()
+        self.start(url)
+
+    def close(self):
+        self.stop()
+        if self.audio_sink is not None:
+            self.audio_sink.close()
+            self.audio_sink = None
@@ -0,0 +1,200 @@
+"""Stream failover across the alternate URLs of a station.
+
+A session keeps an ordered list of candidate URLs for the station being
+played: the variant that worked last time, url_resolved, url, the entries
+of a playlist and stations with the same name (other codecs/bitrates).
+When the player dies or stalls the next candidate is tried. A candidate that
+keeps playing for a while is remembered per station in
+~/.radio-active-last-good and tried first on the next start.
+"""
+
+import json
+import os
+import threading
+
+from zenlog import log
+
+from radioactive.playlist import fetch_variants, is_playlist_url
+from radioactive.storage import update_json
+
+# seconds a stream has to play before it counts as working
+HEALTHY_AFTER = 10
+
+
+class LastGoodStore:
+    """Last working stream URL per station"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(
+            os.path.expanduser("~"), ".radio-active-last-good"
+        )
+        self.entries = None
+        self.lock = threading.Lock()
+
+    def _load(self):
+        if self.entries is None:
+            try:
+                with open(self.path) as f:
+                    self.entries = json.load(f)
+            except Exception:
+                self.entries = {}
+        return self.entries
+
+    def get(self, key):
+        with self.lock:
+            return self._load().get(key)
+
+    def set(self, key, url):
+        with self.lock:
+            entries = self._load()
+            if entries.get(key) == url:
+                return
+            entries[key] = url
+            try:
+                self.entries = update_json(
+                    self.path, lambda data: data.__setitem__(key, url)
+                )
+            except Exception as e:
+                log.debug(f"Could not save last good stream: {e}")
+
+
+last_good_store = LastGoodStore()
+
+
+def station_key(station_info, url=""):
+    """Stable key for a station: its uuid, else its name, else the url"""
+    info = station_info if isinstance(station_info, dict) else {}
+    if info.get("stationuuid"):
+        return info["stationuuid"]
+    if info.get("name"):
+        return "name:" + info["name"].strip().lower()
+    return "url:" + url
+
+
+def build_candidates(url, station_info=None, alternates=(), siblings=()):
+    """Ordered, de-duplicated candidate URLs for one station"""
+    info = station_info if isinstance(station_info, dict) else {}
+    ordered = [
+        last_good_store.get(station_key(info, url)),
+        info.get("url_resolved"),
+        info.get("url"),
+        url,
+    ]
+    ordered.extend(alternates)
+    for sibling in siblings:
+        ordered.append(sibling.get("url_resolved") or sibling.get("url"))
+
+    candidates = []
+    for candidate in ordered:
+        if candidate and candidate.strip() and candidate.strip() not in candidates:
+            candidates.append(candidate.strip())
+    return candidates
+
+
+class FailoverSession:
+    """Candidate URLs of the station being played and which of them failed"""
+
+    def __init__(self, url, station_info=None, healthy_after=HEALTHY_AFTER):
+        self.station_info = station_info if isinstance(station_info, dict) else {}
+        self.key = station_key(self.station_info, url)
+        self.candidates = build_candidates(url, self.station_info)
+        # kbps per candidate where known, used for adaptive bitrate
+        self.bitrates = {}
+        self._note_bitrate(self.station_info, url)
+        # the station's own URLs and playlist entries, not same-name stations
+        own = (url, self.station_info.get("url"), self.station_info.get("url_resolved"))
+        self.own_urls = {u.strip() for u in own if u and u.strip()}
+        self.healthy_after = healthy_after
+        self.failed = set()
+        self.current = None
+        self.lock = threading.Lock()
+        self._timer = None
+
+    def _note_bitrate(self, station, *urls):
+        try:
+            kbps = int(station.get("bitrate") or 0)
+        except (TypeError, ValueError):
+            kbps = 0
+        if kbps <= 0:
+            return
+        for url in urls + (station.get("url"), station.get("url_resolved")):
+            if url:
+                self.bitrates.setdefault(url.strip(), kbps)
+
+    @property
+    def first_url(self):
+        return self.candidates[0]
+
+    def discover(self, handler=None):
+        """Add playlist entries and same-name stations (network, run in background)"""
+        base = self.station_info.get("url") or self.candidates[-1]
+        variants = fetch_variants(base) if is_playlist_url(base) else []
+        alternates = [entry for _, entry in variants]
+        siblings = []
+        name = self.station_info.get("name")
+        if handler is not None and name:
+            siblings = [
+                s
+                for s in handler.search_station_variants(name)
+                if s.get("stationuuid") != self.station_info.get("stationuuid")
+            ]
+        with self.lock:
+            for kbps, entry in variants:
+                self.own_urls.add(entry)
+                if kbps:
+                    self.bitrates[entry] = kbps
+            for sibling in siblings:
+                self._note_bitrate(sibling)
+            for candidate in build_candidates(
+                "", self.station_info, alternates, siblings
+            ):
+                if candidate not in self.candidates:
+                    self.candidates.append(candidate)
+        log.debug(f"failover: {len(self.candidates)} candidates for {self.key}")
+
+    def started(self, url):
+        """url is now playing; remember it if it keeps playing"""
+        self.current = url
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.healthy_after, self._healthy, args=(url,))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _healthy(self, url):
+        if self.current != url:
+            return
+        with self.lock:
+            self.failed.clear()
+        last_good_store.set(self.key, url)
+
+    def next_url(self, failed_url):
+        """Next candidate after failed_url, None once all of them failed"""
+        with self.lock:
+            if failed_url:
+                self.failed.add(failed_url)
+            for candidate in self.candidates:
+                if candidate not in self.failed:
+                    return candidate
+            # everything failed, start over on the next request
+            self.failed.clear()
+            return None
+
+    def variants(self, own=False):
+        """Working candidates with a known bitrate as (kbps, url), lowest first.
+
+        With own=True only the station's own streams, no same-name stations.
+        """
+        with self.lock:
+            return sorted(
+                (self.bitrates[url], url)
+                for url in self.candidates
+                if url in self.bitrates
+                and url not in self.failed
+                and (not own or url in self.own_urls)
+            )
+
+    def close(self):
+        self.current = None
+        if self._timer is not None:
+            self._timer.cancel()
@@ -2,47 +2,33 @@ import os
 import signal
 import subprocess
 import sys
-import threading
 from shutil import which
-from time import sleep
 
-import psutil
 from zenlog import log
 
+from radioactive import tracing
+from radioactive.player import PlayerBackend, register_backend
+from radioactive.runtime import kill_registered_processes
+
 
 def kill_background_ffplays():
-    all_processes = psutil.process_iter(attrs=["pid", "name"])
-    count = 0
-    # Iterate through the processes and terminate those named "ffplay"
-    for process in all_processes:
-        try:
-            if process.info["name"] == "ffplay":
-                pid = process.info["pid"]
-                p = psutil.Process(pid)
-                p.terminate()
-                count += 1
-                log.info(f"Terminated ffplay process with PID {pid}")
-                if p.is_running():
-                    p.kill()
-                    log.debug(f"Forcefully killing ffplay process with PID {pid}")
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            # Handle exceptions, such as processes that no longer exist or access denied
-            log.debug("Could not terminate a ffplay processes!")
-    if count == 0:
+    # only what radio-active started itself, see radioactive.runtime
+    if kill_registered_processes() == 0:
         log.info("No background radios are running!")
 
 
-class Ffplay:
-    def __init__(self, URL, volume, loglevel):
+@register_backend("ffplay")
+class Ffplay(PlayerBackend):
+    name = "ffplay"
+    # runs with -loglevel error
+    stderr_errors = True
+
+    def __init__(self, volume=None, loglevel="info"):
+        super().__init__(volume, loglevel)
         self.program_name = "ffplay"
-        self.url = URL
-        self.volume = volume
-        self.loglevel = loglevel
         self.is_playing = False
-        self.process = None
 
         self._check_ffplay_installation()
-        self.start_process()
 
     def _check_ffplay_installation(self):
         self.exe_path = which(self.program_name)
@@ -57,40 +43,46 @@ class Ffplay:
             ffplay_commands.extend(["-loglevel", "error"])
         else:
             ffplay_commands.extend(["-loglevel", "error", "-nodisp"])
+        if tracing.enabled():
+            # the status line (M-A: ...) tells when audio starts, only
+            # printed below -loglevel info when asked for
+            ffplay_commands.append("-stats")
 
         return ffplay_commands
 
+    def start(self, url):
+        self.url = url
+        self.start_process()
+
     def start_process(self):
         try:
             ffplay_commands = self._construct_ffplay_commands()
-            self.process = subprocess.Popen(
-                ffplay_commands,
-                shell=False,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
+            # output is drained continuously, errors and exits arrive as events
+            self._spawn(ffplay_commands, capture=True)
 
             self.is_running = True
             self.is_playing = True
-            self._start_error_thread()
+            self.is_paused = False
 
         except Exception as e:
             log.error("Error while starting radio: {}".format(e))
 
-    def _start_error_thread(self):
-        error_thread = threading.Thread(target=self._check_error_output)
-        error_thread.daemon = True
-        error_thread.start()
-
-    def _check_error_output(self):
-        while self.is_running:
-            stderr_result = self.process.stderr.readline()
-            if stderr_result:
-                self._handle_error(stderr_result)
-                self.is_running = False
-                self.stop()
-            sleep(2)
+    def _on_player_event(self, event):
+        if event.kind == "crash":
+            self.is_playing = False
+            self._crashed(event)
+            return
+        if event.kind == "playing":
+            self._audio_started()
+            return
+        if event.kind != "error" or not self.is_running:
+            return
+        self._handle_error(event.message)
+        self.is_running = False
+        self.stop()
+        # let the session try another stream
+        if self.on_exit is not None:
+            self.on_exit(self, event)
 
     def _handle_error(self, stderr_result):
         print()
@@ -107,25 +99,7 @@ class Ffplay:
         os.kill(parent_pid, signal.SIGINT)
 
     def is_active(self):
-        if not self.process:
-            log.warning("Process is not initialized")
-            return False
-
-        try:
-            proc = psutil.Process(self.process.pid)
-            if proc.status() == psutil.STATUS_ZOMBIE:
-                log.debug("Process is a zombie")
-                return False
-
-            if proc.status() in [psutil.STATUS_RUNNING, psutil.STATUS_SLEEPING]:
-                return True
-
-            log.warning("Process is not in an expected state")
-            return False
-
-        except (psutil.NoSuchProcess, Exception) as e:
-            log.debug("Process not found or error while checking status: {}".format(e))
-            return False
+        return self.is_alive()
 
     def play(self):
         if not self.is_playing:
@@ -133,6 +107,7 @@ class Ffplay:
 
     def stop(self):
         if self.is_playing:
+            self._expect_exit()
             try:
                 self.process.kill()
                 self.process.wait(timeout=5)
@@ -145,16 +120,7 @@ class Ffplay:
                 raise
             finally:
                 self.is_playing = False
+                self.is_running = False
                 self.process = None
         else:
             log.debug("Radio is not currently playing")
-            self.terminate_parent_process()
-
-    def toggle(self):
-        if self.is_playing:
-            log.debug("Stopping the ffplay process")
-            self.is_running = False
-            self.stop()
-        else:
-            log.debug("Starting the ffplay process")
-            self.start_process()
@@ -1,133 +1,127 @@
-import sys
-
-from zenlog import log
-
-
-# function to filter strings
-def _filter_entries_by_key(data, filter_param, key):
-    log.debug(f"filter: {filter_param}")
-
-    filtered_entries = []
-
-    for entry in data:
-        value = entry.get(key)
-
-        if value is not None and value != "":
-            if "!=" in filter_param:
-                # Handle exclusion
-                exclusion_values = filter_param.split("!=")[1].split(",")
-
-                if all(
-                    exclusion_value.lower() not in value.lower()
-                    for exclusion_value in exclusion_values
-                ):
-                    filtered_entries.append(entry)
-
-            elif "=" in filter_param:
-                # Handle inclusion
-                inclusion_values = filter_param.split("=")[1].split(",")
-
-                if any(
-                    inclusion_value.lower() in value.lower()
-                    for inclusion_value in inclusion_values
-                ):
-                    filtered_entries.append(entry)
-
-    return filtered_entries
-
-
-# function to filter numeric values
-def _filter_entries_by_numeric_key(data, filter_param, key):
-    filtered_entries = []
-
-    # filter_key = filter_param.split(key)[0]  # most left hand of the expression
-    filter_param = filter_param.split(key)[1]  # portion after the operator
-    filter_operator = filter_param[0]  # operator part
-    filter_value = int(filter_param[1:])  # value part
-    # log.debug(f"filter: parameter:{filter_param}")
-
-    for entry in data:
-        value = int(entry.get(key))
-
-        if value is not None:
-            try:
-                if filter_operator not in [">", "<", "="]:
-                    log.warning("Unsupported filter operator, not filtering !!")
-                    return data
-                if filter_operator == "<" and value < filter_value:
-                    filtered_entries.append(entry)
-                elif filter_operator == ">" and value > filter_value:
-                    filtered_entries.append(entry)
-                elif filter_operator == "=" and value == filter_value:
-                    filtered_entries.append(entry)
-
-            except ValueError:
-                log.error(f"Invalid filter value for {key}: {filter_param}")
-                sys.exit(1)
-
-    return filtered_entries
-
-
-# allowed string string filters
-def _filter_entries_by_name(data, filter_param):
-    return _filter_entries_by_key(data, filter_param, key="name")
-
-
-def _filter_entries_by_language(data, filter_param):
-    return _filter_entries_by_key(data, filter_param, key="language")
+"""Client-side filtering of search results (--filter).
 
+Results are turned into a StationTable: one column per field, built only
+when a filter needs it, lower-cased once, low-cardinality strings interned
+and numbers packed into arrays. Filters then narrow a list of row indexes
+instead of walking and copying the station dicts for every expression.
+"""
 
-def _filter_entries_by_country(data, filter_param):
-    return _filter_entries_by_key(data, filter_param, key="countrycode")
-
-
-def _filter_entries_by_tags(data, filter_param):
-    return _filter_entries_by_key(data, filter_param, key="tags")
-
-
-def _filter_entries_by_codec(data, filter_param):
-    return _filter_entries_by_key(data, filter_param, key="codec")
-
-
-# allowed numeric filters
-def _filter_entries_by_votes(data, filter_param):
-    return _filter_entries_by_numeric_key(data, filter_param, key="votes")
-
-
-def _filter_entries_by_bitrate(data, filter_param):
-    return _filter_entries_by_numeric_key(data, filter_param, key="bitrate")
-
-
-def _filter_entries_by_clickcount(data, filter_param):
-    return _filter_entries_by_numeric_key(data, filter_param, key="clickcount")
-
+import re
+import sys
+from array import array
 
-# top level filter function
-def _filter_results(data, expression):
-    log.debug(f"Filter exp: {expression}")
-    if not data:
-        log.error("Empty results")
-        sys.exit(0)
+from zenlog import log
 
-    if "name" in expression:
-        return _filter_entries_by_name(data, expression)
-    elif "language" in expression:
-        return _filter_entries_by_language(data, expression)
-    elif "country" in expression:
-        return _filter_entries_by_country(data, expression)
-    elif "tags" in expression:
-        return _filter_entries_by_tags(data, expression)
-    elif "codec" in expression:
-        return _filter_entries_by_codec(data, expression)
-    elif "bitrate" in expression:
-        return _filter_entries_by_bitrate(data, expression)
-    elif "clickcount" in expression:
-        return _filter_entries_by_clickcount(data, expression)
-    elif "votes" in expression:
-        return _filter_entries_by_votes(data, expression)
-    else:
+# filter name -> station key, checked in this order against the expression
+STRING_FILTERS = (
+    ("name", "name"),
+    ("language", "language"),
+    ("country", "countrycode"),
+    ("tags", "tags"),
+    ("codec", "codec"),
+)
+NUMERIC_FILTERS = (
+    ("bitrate", "bitrate"),
+    ("clickcount", "clickcount"),
+    ("votes", "votes"),
+)
+# few distinct values, one shared string object each
+_INTERNED = ("countrycode", "codec", "language")
+
+
+class StationTable:
+    """Columnar view of a list of station dicts"""
+
+    def __init__(self, stations):
+        self.stations = stations
+        self._columns = {}
+
+    def __len__(self):
+        return len(self.stations)
+
+    def text_column(self, key):
+        column = self._columns.get(key)
+        if column is None:
+            column = [(station.get(key) or "").lower() for station in self.stations]
+            if key in _INTERNED:
+                column = list(map(sys.intern, column))
+            self._columns[key] = column
+        return column
+
+    def number_column(self, key):
+        column = self._columns.get(key)
+        if column is None:
+            column = array("q", [int(station.get(key)) for station in self.stations])
+            self._columns[key] = column
+        return column
+
+    def _values(self, rows, key, numeric=False):
+        """Values of key for rows; a whole column is only built for many rows"""
+        if key not in self._columns and 2 * len(rows) < len(self):
+            if numeric:
+                return [int(self.stations[i].get(key)) for i in rows]
+            return [(self.stations[i].get(key) or "").lower() for i in rows]
+        column = self.number_column(key) if numeric else self.text_column(key)
+        if len(rows) == len(self):
+            return column
+        return [column[i] for i in rows]
+
+    def filter_text(self, rows, key, filter_param):
+        """Rows whose key contains any of (=) or none of (!=) the values"""
+        log.debug(f"filter: {filter_param}")
+        if "!=" in filter_param:
+            exclude = True
+            needles = filter_param.split("!=")[1].split(",")
+        elif "=" in filter_param:
+            exclude = False
+            needles = filter_param.split("=")[1].split(",")
+        else:
+            return []
+        values = self._values(rows, key)
+        if len(needles) == 1:
+            needle = needles[0].lower()
+            if exclude:
+                return [i for i, v in zip(rows, values) if v and needle not in v]
+            return [i for i, v in zip(rows, values) if v and needle in v]
+        search = re.compile("|".join(re.escape(n.lower()) for n in needles)).search
+        if exclude:
+            return [i for i, v in zip(rows, values) if v and not search(v)]
+        return [i for i, v in zip(rows, values) if v and search(v)]
+
+    def filter_number(self, rows, key, filter_param):
+        """Rows whose key compares (<, > or =) to the value after it"""
+        filter_param = filter_param.split(key)[1]  # portion after the key
+        filter_operator = filter_param[:1]
+        if filter_operator not in (">", "<", "="):
+            log.warning("Unsupported filter operator, not filtering !!")
+            return rows
+        try:
+            filter_value = int(filter_param[1:])
+        except ValueError:
+            log.error(f"Invalid filter value for {key}: {filter_param}")
+            sys.exit(1)
+
+        values = self._values(rows, key, numeric=True)
+        if filter_operator == "<":
+            return [i for i, v in zip(rows, values) if v < filter_value]
+        if filter_operator == ">":
+            return [i for i, v in zip(rows, values) if v > filter_value]
+        return [i for i, v in zip(rows, values) if v == filter_value]
+
+    def filter(self, rows, expression):
+        """Apply one filter expression to the row indexes"""
+        log.debug(f"Filter exp: {expression}")
+        for name, key in STRING_FILTERS:
+            if name in expression:
+                return self.filter_text(rows, key, expression)
+        for name, key in NUMERIC_FILTERS:
+            if name in expression:
+                return self.filter_number(rows, key, expression)
         log.warning("Unknown filter expression, not filtering!")
-        return data
+        return rows
+
+    def select(self, rows):
+        return [self.stations[i] for i in rows]
 
 
 # Top most function for multiple filtering expressions with '&'
@@ -138,14 +132,16 @@ def filter_expressions(data, input_expression):
     log.info(
         "Setting a higher value for the --limit parameter is preferable when filtering stations."
     )
+    if not data:
+        log.error("Empty results")
+        sys.exit(0)
+
+    table = StationTable(data)
+    rows = range(len(table))
     if "&" in input_expression:
         log.debug("filter: multiple expressions found")
-        expression_parts = input_expression.split("&")
-
-        for expression in expression_parts:
-            if data:
-                data = _filter_results(data, expression)
-        return data
-
-    else:
-        return _filter_results(data, input_expression)
+    for expression in input_expression.split("&"):
+        if not rows:
+            break
+        rows = table.filter(rows, expression)
+    return table.select(rows)
@@ -2,11 +2,9 @@
     This handler solely depends on pyradios module to communicate with our remote API
 """
 
-import datetime
 import json
 import sys
 
-import requests_cache
 import warnings
 # Suppress deprecation warning emitted when pyradios imports pkg_resources
 warnings.filterwarnings(
@@ -19,6 +17,8 @@ from rich.console import Console
 from rich.table import Table
 from zenlog import log
 
+from radioactive.api_cache import make_session
+from radioactive.clicks import click_queue
 from radioactive.filter import filter_expressions
 
 console = Console()
@@ -82,12 +82,12 @@ def print_table(response, columns, sort_by, filter_expression):
         )
         table.add_column("ID", justify="center")
 
+        # "col_name:response_key@max_str", parsed once for all rows
+        col_specs = []
         for col_spec in columns:
-            col_name, response_key, max_str = (
-                col_spec.split(":")[0],
-                col_spec.split(":")[1].split("@")[0],
-                int(col_spec.split("@")[1]),
-            )
+            col_name, rest = col_spec.split(":", 1)
+            response_key, max_str = rest.split("@")
+            col_specs.append((response_key, int(max_str)))
             table.add_column(col_name, justify="left")
 
         # do not need extra columns for these cases
@@ -97,12 +97,7 @@ def print_table(response, columns, sort_by, filter_expression):
         for i, station in enumerate(response):
             row_data = [str(i + 1)]  # for ID
 
-            for col_spec in columns:
-                col_name, response_key, max_str = (
-                    col_spec.split(":")[0],
-                    col_spec.split(":")[1].split("@")[0],
-                    int(col_spec.split("@")[1]),
-                )
+            for response_key, max_str in col_specs:
                 row_data.append(
                     trim_string(station.get(response_key, ""), max_length=max_str)
                 )
@@ -134,11 +129,8 @@ class Handler:
 
         # When RadioBrowser can not be initiated properly due to no internet (probably)
         try:
-            expire_after = datetime.timedelta(days=3)
-            session = requests_cache.CachedSession(
-                cache_name="cache", backend="sqlite", expire_after=expire_after
-            )
-            self.API = RadioBrowser(session=session)
+            self.API = RadioBrowser(session=make_session())
+            click_queue.start(self.API.click_counter)
         except Exception as e:
             log.debug("Error: {}".format(e))
             log.critical("Something is wrong with your internet connection")
@@ -155,10 +147,6 @@ class Handler:
         if len(self.response) == 1:
             log.debug(json.dumps(self.response[0], indent=3))
             self.target_station = self.response[0]
-
-            # register a valid click to increase its popularity
-            self.API.click_counter(self.target_station["stationuuid"])
-
             return self.response
 
     # ---------------------------- NAME -------------------------------- #
@@ -196,6 +184,15 @@ class Handler:
             log.error("Something went wrong. please try again.")
             sys.exit(1)
 
+    def station_info_by_uuid(self, _uuid):
+        """station record for a uuid without clicking it, None on failure"""
+        try:
+            response = self.API.station_by_uuid(_uuid)
+            return response[0] if len(response) == 1 else None
+        except Exception as e:
+            log.debug("Could not fetch station {}: {}".format(_uuid, e))
+            return None
+
     # -------------------------- COUNTRY ----------------------#
     def discover_by_country(self, country_code_or_name, limit, sort_by, filter_with):
         # set reverse to false if name is is the parameter for sorting
@@ -328,10 +325,18 @@ class Handler:
             filter_with,
         )
 
-    # ---- Increase click count ------------- #
-    def vote_for_uuid(self, UUID):
+    # ------------------------- VARIANTS ------------------------ #
+    def search_station_variants(self, name, limit=10):
+        """stations with exactly this name, usually other codecs/bitrates"""
         try:
-            result = self.API.click_counter(UUID)
-            return result
+            return self.API.search(
+                name=name, name_exact=True, limit=limit, hidebroken=True
+            )
         except Exception as e:
-            log.debug("Something went wrong during increasing click count:{}".format(e))
+            log.debug("Could not search station variants: {}".format(e))
+            return []
+
+    # ---- Increase click count ------------- #
+    def vote_for_uuid(self, UUID):
+        """register a click to increase its popularity, sent in the background"""
+        return click_queue.submit(UUID)
@@ -0,0 +1,139 @@
+"""Health check of the favourite stations (radio --check-favorites).
+
+Every favourite is probed concurrently by a bounded pool: UUID entries get
+fresh station data from the API first, playlists are resolved, then the
+stream is opened and its first bytes read. Latency, status, the resolved URL
+and the codec/bitrate announced in the Content-Type and ICY headers are
+stored with the entry under "health", together with the number of failed
+checks in a row, so dead entries can be flagged and sorted last.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from zenlog import log
+
+from radioactive.alias import station_metadata
+from radioactive.playlist import is_playlist_url, resolve_stream
+
+CHECK_WORKERS = 16
+CHECK_TIMEOUT = 8
+
+_CONTENT_TYPES = {
+    "audio/mpeg": "MP3",
+    "audio/mp3": "MP3",
+    "audio/aac": "AAC",
+    "audio/aacp": "AAC+",
+    "audio/x-aac": "AAC",
+    "audio/ogg": "OGG",
+    "application/ogg": "OGG",
+    "audio/opus": "OPUS",
+    "audio/flac": "FLAC",
+    "application/vnd.apple.mpegurl": "HLS",
+    "application/x-mpegurl": "HLS",
+    "audio/mpegurl": "HLS",
+}
+
+
+def codec_from_headers(headers):
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return _CONTENT_TYPES.get(content_type)
+
+
+def probe(url, timeout=CHECK_TIMEOUT):
+    """Open url and read its first bytes; returns the health fields"""
+    started = time.time()
+    result = {"ok": False, "checked": int(started), "resolved": url}
+    try:
+        with requests.get(
+            url, stream=True, timeout=timeout, headers={"Icy-MetaData": "1"}
+        ) as response:
+            result["status"] = response.status_code
+            result["resolved"] = response.url
+            response.raise_for_status()
+            if not response.raw.read(1):
+                raise IOError("no data")
+            result["latency_ms"] = int((time.time() - started) * 1000)
+            result["ok"] = True
+            headers = response.headers
+            codec = codec_from_headers(headers)
+            if codec:
+                result["codec"] = codec
+            if headers.get("icy-br", "").split(",")[0].strip().isdigit():
+                result["bitrate"] = int(headers["icy-br"].split(",")[0])
+            if headers.get("icy-name"):
+                result["icy_name"] = headers["icy-name"].strip()
+    except Exception as e:
+        result["error"] = str(e)[:200]
+    return result
+
+
+def check_entry(entry, handler=None, timeout=CHECK_TIMEOUT):
+    """Updated fields for one favourite: fresh station data and "health" """
+    value = entry["uuid_or_url"].strip()
+    fields = {}
+    url = value
+    if "://" not in value:
+        info = handler.station_info_by_uuid(value) if handler is not None else None
+        if info is not None:
+            fields = station_metadata(info)
+        url = fields.get("url_resolved") or entry.get("url_resolved")
+        url = url or fields.get("url") or entry.get("url")
+    if not url:
+        health = {"ok": False, "checked": int(time.time()), "error": "no stream url"}
+    else:
+        if is_playlist_url(url):
+            url = resolve_stream(url, key=entry["name"])
+        health = probe(url, timeout)
+
+    health["failures"] = 0 if health["ok"] else _failures(entry) + 1
+    fields["health"] = health
+    return fields
+
+
+def _failures(entry):
+    return (entry.get("health") or {}).get("failures", 0)
+
+
+def check_favorites(alias, handler=None, workers=CHECK_WORKERS):
+    """Probe all favourites, store the results; returns {name: health}"""
+    alias.generate_map()
+    entries = list(alias.alias_map)
+    if not entries:
+        return {}
+    updates = {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(entries))) as pool:
+        futures = {pool.submit(check_entry, entry, handler): entry for entry in entries}
+        for future, entry in futures.items():
+            name = entry["name"]
+            try:
+                updates[name] = future.result()
+            except Exception as e:
+                log.debug(f"Health check of {name} failed: {e}")
+                updates[name] = {
+                    "health": {
+                        "ok": False,
+                        "checked": int(time.time()),
+                        "error": str(e)[:200],
+                        "failures": _failures(entry) + 1,
+                    }
+                }
+    alias.update_entries(updates)
+    return {name: fields["health"] for name, fields in updates.items()}
+
+
+def is_dead(entry):
+    """The last check of entry failed"""
+    health = entry.get("health")
+    return bool(health) and not health.get("ok")
+
+
+def health_rank(entry):
+    """Sort key: working stations by latency, then unchecked, then dead ones"""
+    health = entry.get("health")
+    if not health:
+        return (1, 0)
+    if health.get("ok"):
+        return (0, health.get("latency_ms", 0))
+    return (2, health.get("failures", 0))
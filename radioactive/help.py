@@ -95,6 +95,12 @@ def show_help():
         "False",
     )
 
+    table.add_row(
+        "--check-favorites",
+        "Probe all favorite stations, flag dead ones",
+        "False",
+    )
+
     table.add_row(
         "--limit, -L",
         "Limit the number of station results",
@@ -136,6 +142,23 @@ def show_help():
         "mp3",
     )
 
+    table.add_row(
+        "--postprocess",
+        "Record with stream copy, then transcode/normalise/tag in background",
+        "False",
+    )
+    table.add_row(
+        "--no-postprocess",
+        "Record straight to the target format, even if the config enables it",
+        "",
+    )
+
+    table.add_row(
+        "recordings",
+        "List recordings; filter with --station, --track, --date YYYY-MM-DD",
+        "",
+    )
+
     table.add_row(
         "--kill, -K",
         "Stop background radios",
@@ -148,9 +171,27 @@ def show_help():
         "info",
     )
 
+    table.add_row(
+        "--trace-file",
+        "Write start-up timings to a file (.json for Chrome trace)",
+        "None",
+    )
+
+    table.add_row(
+        "--metrics-port",
+        "Serve Prometheus metrics on localhost",
+        "None",
+    )
+
+    table.add_row(
+        "--metrics-file",
+        "Write Prometheus metrics to a file",
+        "None",
+    )
+
     table.add_row(
         "--player",
-        "Media player to use. vlc/mpv/ffplay",
+        "Media player to use. vlc/mpv/ffplay/embedded",
         "ffplay",
     )
 
@@ -6,6 +6,8 @@ import os.path
 
 from zenlog import log
 
+from radioactive.storage import atomic_write
+
 
 class Last_station:
 
@@ -35,5 +37,4 @@ class Last_station:
         """dumps the current station information as a json file"""
 
         log.debug("Dumping station information")
-        with open(self.last_station_path, "w") as f:
-            json.dump(station, f)
+        atomic_write(self.last_station_path, json.dumps(station))
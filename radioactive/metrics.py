@@ -0,0 +1,172 @@
+"""Runtime metrics of a playback/recording session, in Prometheus text format.
+
+Counters, gauges and histograms are kept in memory by the global `metrics`
+registry and fed from the player session, the recorder progress reader,
+the radio-browser HTTP session and the local caches. They can be scraped
+from http://127.0.0.1:<port>/metrics (--metrics-port) and/or written to a
+file every few seconds (--metrics-file, usable with the node_exporter
+textfile collector). Collecting is cheap and always on, nothing is exposed
+unless one of the two options is given.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from zenlog import log
+
+from radioactive.storage import atomic_write
+
+METRICS_FILE_INTERVAL = 10
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_HELP = {
+    "radioactive_stream_bytes_total": ("counter", "Bytes received from the stream"),
+    "radioactive_stream_throughput_kbps": ("gauge", "Measured stream input rate"),
+    "radioactive_player_restarts_total": ("counter", "Player reconnects by reason"),
+    "radioactive_failovers_total": (
+        "counter",
+        "Moves to another stream of the station",
+    ),
+    "radioactive_title_changes_total": ("counter", "Now-playing title changes"),
+    "radioactive_recording_bytes": ("gauge", "Size of the running recording"),
+    "radioactive_recording_speed": ("gauge", "Recorder speed relative to real time"),
+    "radioactive_api_request_seconds": ("histogram", "radio-browser API latency"),
+    "radioactive_cache_requests_total": ("counter", "Cache lookups by result"),
+}
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in labels
+    )
+    return "{" + pairs + "}"
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+        self.histograms = {}
+        # called at render time, for values that are cheaper to read than to push
+        self.collectors = []
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = value
+
+    def get(self, name, **labels):
+        with self.lock:
+            return self.values.get((name, tuple(sorted(labels.items()))), 0)
+
+    def remove(self, name, **labels):
+        with self.lock:
+            self.values.pop((name, tuple(sorted(labels.items()))), None)
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = [[0] * len(LATENCY_BUCKETS), 0.0, 0]
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    hist[0][i] += 1
+            hist[1] += value
+            hist[2] += 1
+
+    def cache(self, cache, hit):
+        result = "hit" if hit else "miss"
+        self.inc("radioactive_cache_requests_total", cache=cache, result=result)
+
+    def add_collector(self, collector):
+        self.collectors.append(collector)
+
+    def render(self):
+        for collector in self.collectors:
+            try:
+                collector(self)
+            except Exception as e:
+                log.debug(f"metrics collector: {e}")
+        with self.lock:
+            values = sorted(self.values.items())
+            histograms = sorted(
+                (key, (list(h[0]), h[1], h[2])) for key, h in self.histograms.items()
+            )
+        lines = []
+        seen = set()
+
+        def _header(name):
+            if name not in seen and name in _HELP:
+                kind, text = _HELP[name]
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+            seen.add(name)
+
+        for (name, labels), value in values:
+            _header(name)
+            lines.append(f"{name}{_labels(labels)} {value}")
+        for (name, labels), (buckets, total, count) in histograms:
+            _header(name)
+            for bound, bucket in zip(LATENCY_BUCKETS, buckets):
+                le = labels + (("le", bound),)
+                lines.append(f"{name}_bucket{_labels(le)} {bucket}")
+            lines.append(f'{name}_bucket{_labels(labels + (("le", "+Inf"),))} {count}')
+            lines.append(f"{name}_sum{_labels(labels)} {total}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = metrics.render().encode("utf8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port):
+    """Serve /metrics on 127.0.0.1:port from a background thread"""
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", port), _MetricsHandler)
+    except OSError as e:
+        log.warning(f"Can not serve metrics on port {port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    log.debug(f"metrics on http://127.0.0.1:{port}/metrics")
+    return server
+
+
+def write_metrics_file(path, interval=METRICS_FILE_INTERVAL):
+    """Rewrite path with the current metrics every interval seconds"""
+
+    def _run():
+        while True:
+            try:
+                atomic_write(path, metrics.render())
+            except Exception as e:
+                log.debug(f"metrics file: {e}")
+            time.sleep(interval)
+
+    threading.Thread(target=_run, daemon=True).start()
@@ -1,12 +1,127 @@
-import subprocess
+import json
+import os
+import socket
 import sys
+import tempfile
+import threading
 from shutil import which
+from time import sleep, time
 
 from zenlog import log
 
+from radioactive.player import PlayerBackend, register_backend
 
-class MPV:
-    def __init__(self):
+
+def _ipc_path():
+    name = f"radio-active-mpv-{os.getpid()}"
+    if os.name == "nt":
+        return rf"\\.\pipe\{name}"
+    return os.path.join(tempfile.gettempdir(), f"{name}.sock")
+
+
+class MpvIPC:
+    """Minimal client for mpv's JSON IPC (unix socket / windows named pipe)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = None
+        self.buffer = b""
+        self.request_id = 0
+        self.lock = threading.Lock()
+
+    def connect(self, timeout=3.0):
+        deadline = time() + timeout
+        while True:
+            try:
+                if os.name == "nt":
+                    self.conn = open(self.path, "r+b", buffering=0)
+                else:
+                    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                    sock.settimeout(timeout)
+                    sock.connect(self.path)
+                    self.conn = sock
+                return True
+            except OSError:
+                if time() > deadline:
+                    return False
+                sleep(0.05)
+
+    def _send(self, data):
+        if os.name == "nt":
+            self.conn.write(data)
+        else:
+            self.conn.sendall(data)
+
+    def _recv(self):
+        if os.name == "nt":
+            return self.conn.read(4096)
+        return self.conn.recv(4096)
+
+    def command(self, *args):
+        """Send a command and wait for its reply, returns the reply 'data'"""
+        with self.lock:
+            if self.conn is None:
+                raise ConnectionError("mpv IPC is not connected")
+            self.request_id += 1
+            request_id = self.request_id
+            message = {"command": list(args), "request_id": request_id}
+            self._send(json.dumps(message).encode("utf8") + b"\n")
+            while True:
+                while b"\n" not in self.buffer:
+                    chunk = self._recv()
+                    if not chunk:
+                        raise ConnectionError("mpv IPC connection closed")
+                    self.buffer += chunk
+                line, self.buffer = self.buffer.split(b"\n", 1)
+                reply = json.loads(line)
+                # skip asynchronous events and stale replies
+                if reply.get("request_id") != request_id:
+                    continue
+                if reply.get("error") != "success":
+                    raise RuntimeError(reply.get("error"))
+                return reply.get("data")
+
+    def events(self):
+        """Yield asynchronous events until the connection is closed"""
+        if os.name != "nt":
+            self.conn.settimeout(None)
+        while True:
+            while b"\n" not in self.buffer:
+                chunk = self._recv() if self.conn is not None else b""
+                if not chunk:
+                    return
+                self.buffer += chunk
+            line, self.buffer = self.buffer.split(b"\n", 1)
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if "event" in message:
+                yield message
+
+    def close(self):
+        try:
+            if self.conn is not None:
+                if os.name != "nt":
+                    # wakes up a thread blocked in recv()
+                    self.conn.shutdown(socket.SHUT_RDWR)
+                self.conn.close()
+        except Exception:
+            pass
+        self.conn = None
+        self.buffer = b""
+
+
+@register_backend("mpv")
+class MPV(PlayerBackend):
+    name = "mpv"
+    supports_ipc = True
+    supports_pause_without_reconnect = True
+    supports_switch_without_restart = True
+    supports_now_playing = True
+
+    def __init__(self, volume=None, loglevel="info"):
+        super().__init__(volume, loglevel)
         self.program_name = "mpv"
         self.exe_path = which(self.program_name)
         log.debug(f"{self.program_name}: {self.exe_path}")
@@ -15,40 +130,186 @@ class MPV:
             log.critical(f"{self.program_name} not found, install it first please")
             sys.exit(1)
 
-        self.is_running = False
-        self.process = None
-        self.url = None
+        self.ipc_path = _ipc_path()
+        self.ipc = None
+        # second connection, only used to receive events
+        self.events_ipc = None
 
     def _construct_mpv_commands(self, url):
-        return [self.exe_path, url]
+        commands = [
+            self.exe_path,
+            "--no-video",
+            "--no-terminal",
+            "--idle=yes",
+            f"--input-ipc-server={self.ipc_path}",
+        ]
+        if self.volume is not None:
+            commands.append(f"--volume={self.volume}")
+        commands.append(url)
+        return commands
+
+    def _command(self, *args):
+        """Run an IPC command, False if the IPC is not usable"""
+        if self.ipc is None:
+            return False
+        try:
+            self.ipc.command(*args)
+            return True
+        except Exception as e:
+            log.debug(f"mpv IPC {args[0]} failed: {e}")
+            return False
+
+    def _get_property(self, name):
+        if self.ipc is None:
+            return None
+        try:
+            return self.ipc.command("get_property", name)
+        except Exception as e:
+            log.debug(f"mpv IPC get_property {name} failed: {e}")
+            return None
+
+    def _ipc_alive(self):
+        return (
+            self.ipc is not None
+            and self.process is not None
+            and self.process.poll() is None
+        )
 
     def start(self, url):
+        # reuse the running process and audio device when we can
+        if self.is_running and self._ipc_alive():
+            self.switch(url)
+            return
+
         self.url = url
         mpv_commands = self._construct_mpv_commands(url)
 
         try:
-            self.process = subprocess.Popen(
-                mpv_commands,
-                shell=False,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
+            # nothing reads the output, never let it fill a pipe
+            self._spawn(mpv_commands, capture=False)
             self.is_running = True
-            log.debug(
-                f"player: {self.program_name} => PID {self.process.pid} initiated"
-            )
+            self.is_paused = False
 
         except Exception as e:
             log.error(f"Error while starting player: {e}")
+            return
 
-    def stop(self):
-        if self.is_running:
-            self.process.kill()
-            self.is_running = False
+        ipc = MpvIPC(self.ipc_path)
+        if ipc.connect():
+            self.ipc = ipc
+            threading.Thread(
+                target=self._watch_events, args=(self.supervisor,), daemon=True
+            ).start()
+            self._watch_first_audio(lambda: self._playing(url))
+        else:
+            log.debug("mpv IPC not available, falling back to restarts")
+            self.ipc = None
+
+    def _playing(self, url):
+        """url is loaded and its playback has started"""
+        return (
+            self._get_property("path") == url
+            and self._get_property("playback-time") is not None
+        )
+
+    def _watch_events(self, supervisor):
+        """Report the end of the stream and cache pauses, mpv itself idles on"""
+        events = MpvIPC(self.ipc_path)
+        if not events.connect():
+            return
+        self.events_ipc = events
+        try:
+            events.command("observe_property", 1, "paused-for-cache")
+            for event in events.events():
+                name = event.get("event")
+                # "stop" is a loadfile replace, "redirect" a playlist
+                if name == "end-file" and event.get("reason") in ("eof", "error"):
+                    reason = event.get("file_error") or event.get("reason")
+                    supervisor.emit("ended", f"mpv: end of stream ({reason})")
+                elif (
+                    name == "property-change"
+                    and event.get("name") == "paused-for-cache"
+                    and event.get("data")
+                ):
+                    supervisor.emit("buffering", "mpv: paused for cache")
+        except Exception as e:
+            log.debug(f"mpv event watcher: {e}")
+        finally:
+            events.close()
+
+    def switch(self, url):
+        """Play another station in the same mpv process"""
+        self.url = url
+        if not self._command("loadfile", url, "replace"):
+            self.stop()
+            self.start(url)
+            return
+        self._command("set_property", "pause", False)
+        self.is_paused = False
+        self.audio_started = False
+        self._watch_first_audio(lambda: self._playing(url))
 
-    def toggle(self):
+    def pause(self):
+        # in place: no reconnect, the buffer is kept
+        if self._ipc_alive() and self._command("set_property", "pause", True):
+            self.is_paused = True
+            return True
+        return super().pause()
+
+    def resume(self):
+        if self._ipc_alive() and self._command("set_property", "pause", False):
+            self.is_paused = False
+            return True
         if self.is_running:
             self.stop()
-        else:
-            self.start(self.url)
+        return super().resume()
+
+    def set_volume(self, volume):
+        if self._ipc_alive() and self._command("set_property", "volume", volume):
+            self.volume = volume
+            return True
+        return super().set_volume(volume)
+
+    def now_playing(self):
+        """Current ICY title as reported by mpv, None if unavailable"""
+        if not self._ipc_alive():
+            return None
+        title = self._get_property("metadata/by-key/icy-title")
+        return title or ""
+
+    def throughput(self):
+        if not self._ipc_alive():
+            return None
+        # bytes per second read into the demuxer cache
+        speed = self._get_property("cache-speed")
+        if not isinstance(speed, (int, float)):
+            return None
+        return speed * 8 / 1000
+
+    def _close_ipc(self):
+        for ipc in (self.ipc, self.events_ipc):
+            if ipc is not None:
+                ipc.close()
+        self.ipc = None
+        self.events_ipc = None
+
+    def _crashed(self, event):
+        self._close_ipc()
+        super()._crashed(event)
+
+    def stop(self):
+        if self.is_running:
+            self._expect_exit()
+            self._command("quit")
+            self._close_ipc()
+            try:
+                self.process.wait(timeout=2)
+            except Exception:
+                self.process.kill()
+            self.is_running = False
+            self.is_paused = False
+            if os.name != "nt":
+                try:
+                    os.remove(self.ipc_path)
+                except OSError:
+                    pass
@@ -1,5 +1,6 @@
 from zenlog import log
 
+from radioactive import tracing
 from radioactive.args import Parser
 
 
@@ -8,6 +9,10 @@ def parse_options():
     args = parser.parse()
     options = {}
     # ----------------- all the args ------------- #
+    options["command"] = args.command
+    options["recordings_station"] = args.recordings_station
+    options["recordings_track"] = args.recordings_track
+    options["recordings_date"] = args.recordings_date
     options["version"] = args.version
     options["show_help_table"] = args.help
     options["loglevel"] = args.log_level
@@ -19,6 +24,14 @@ def parse_options():
         log.level("info")
         log.warning("Correct log levels are: error,warning,info(default),debug")
 
+    # timing breakdown of the start-up, logged in debug mode
+    options["trace_file"] = args.trace_file
+    if args.trace_file or options["loglevel"] == "debug":
+        tracing.enable(args.trace_file)
+
+    options["metrics_port"] = args.metrics_port
+    options["metrics_file"] = args.metrics_file
+
     # check is limit is a valid integer
     limit = args.limit
     options["limit"] = int(limit) if limit else 100
@@ -45,6 +58,7 @@ def parse_options():
     options["add_to_favorite"] = args.add_to_favorite
     options["flush_fav_list"] = args.flush
     options["remove_fav_stations"] = args.remove_fav_stations
+    options["check_favorites"] = args.check_favorites
 
     options["kill_ffplays"] = args.kill_ffplays
 
@@ -59,5 +73,9 @@ def parse_options():
 
     # Recording behaviour
     options["force_mp3"] = getattr(args, "force_mp3", False)
+    options["postprocess"] = args.postprocess
+    options["postprocess_workers"] = parser.defaults.get("postprocess_workers", 1)
+    options["postprocess_nice"] = parser.defaults.get("postprocess_nice", 10)
+    options["postprocess_loudnorm"] = parser.defaults.get("postprocess_loudnorm", True)
 
     return options
@@ -0,0 +1,240 @@
+"""Common interface for audio player backends and the registry used to find them.
+
+Every backend implements start/stop; the rest has a default built on a
+restart. Capability flags tell the session what a backend can do cheaply,
+e.g. pausing without dropping the connection or switching stations in place.
+When the player dies on its own, keeps stalling or idles after its stream
+ended, on_exit(player, event) is called from the supervisor's or the
+backend's watcher threads so the session can react without polling.
+"""
+
+import importlib
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from zenlog import log
+
+from radioactive import tracing
+from radioactive.supervisor import PlayerEvent, PlayerSupervisor
+
+# this many buffering events within STALL_WINDOW seconds count as a stall
+STALL_EVENTS = 3
+STALL_WINDOW = 20
+# stop looking for the first audio of a stream after this long
+FIRST_AUDIO_TIMEOUT = 30
+
+
+class PlayerBackend(ABC):
+    name = ""
+    # controllable over a socket/HTTP interface while running
+    supports_ipc = False
+    # pause keeps the connection and buffer, resume is instant
+    supports_pause_without_reconnect = False
+    # station change reuses the running process and audio device
+    supports_switch_without_restart = False
+    # can report the current stream title itself (no ffprobe)
+    supports_now_playing = False
+    # decodes in-process and can hand out PCM (VU meter, recording)
+    supports_pcm_tap = False
+    # every stderr line is an error, not only the ones that look like one
+    stderr_errors = False
+
+    def __init__(self, volume=None, loglevel="info"):
+        self.volume = volume
+        self.loglevel = loglevel
+        self.url = None
+        self.process = None
+        self.is_running = False
+        self.is_paused = False
+        self.supervisor = None
+        # called with (player, event) after an unexpected exit or a stall
+        self.on_exit = None
+        self.stalled = False
+        self.audio_started = False
+        self._first_audio_watch = None
+
+    def _spawn(self, cmd, capture=False):
+        self.stalled = False
+        self.audio_started = False
+        supervisor = PlayerSupervisor(self.name, stderr_errors=self.stderr_errors)
+        # late events of an earlier process must not touch the current one
+        supervisor.on_event = lambda event: (
+            self._on_player_event(event) if self.supervisor is supervisor else None
+        )
+        self.supervisor = supervisor
+        with tracing.span("player_spawn", player=self.name):
+            self.process = supervisor.spawn(cmd, capture=capture)
+        return self.process
+
+    def _expect_exit(self):
+        if self.supervisor is not None:
+            self.supervisor.expect_exit()
+
+    def _on_player_event(self, event):
+        if event.kind == "crash":
+            self._crashed(event)
+        elif event.kind == "buffering":
+            self._check_stall(event)
+        elif event.kind == "playing":
+            self._audio_started()
+        elif event.kind == "ended":
+            self._stream_ended(event)
+
+    def _audio_started(self):
+        """The first audio of the current stream is playing"""
+        if self.audio_started:
+            return
+        self.audio_started = True
+        tracing.mark("first_audio", player=self.name, url=self.url)
+        tracing.log_breakdown()
+        tracing.flush()
+
+    def _watch_first_audio(self, probe):
+        """Poll probe() until it reports audio, only while tracing"""
+        if not tracing.enabled():
+            return
+
+        # a switch starts a new watch, the old one gives up
+        token = self._first_audio_watch = object()
+
+        def _watch():
+            deadline = time.time() + FIRST_AUDIO_TIMEOUT
+            while (
+                time.time() < deadline
+                and self.is_running
+                and self._first_audio_watch is token
+            ):
+                try:
+                    if probe():
+                        self._audio_started()
+                        return
+                except Exception:
+                    pass
+                time.sleep(0.05)
+
+        threading.Thread(target=_watch, daemon=True).start()
+
+    def _check_stall(self, event):
+        if self.stalled or self.supervisor is None:
+            return
+        recent = [
+            e
+            for e in self.supervisor.events
+            if e.kind == "buffering" and event.time - e.time < STALL_WINDOW
+        ]
+        if len(recent) < STALL_EVENTS:
+            return
+        self.stalled = True
+        log.debug(f"player: {self.name} stalled: {event.message}")
+        if self.on_exit is not None:
+            self.on_exit(self, PlayerEvent("stall", event.message, None, event.time))
+
+    def _crashed(self, event):
+        log.debug(f"player: {self.name} stopped unexpectedly: {event.message}")
+        self.is_running = False
+        if self.on_exit is not None:
+            self.on_exit(self, event)
+
+    def _stream_ended(self, event):
+        """The player is still up but its stream is gone, release it"""
+        if not self.is_running or self.is_paused:
+            return
+        log.debug(f"player: {self.name} stream ended: {event.message}")
+        self.stop()
+        if self.on_exit is not None:
+            self.on_exit(self, event)
+
+    def is_alive(self):
+        """Cheap liveness check, no process table lookups"""
+        return self.supervisor is not None and self.supervisor.is_alive()
+
+    @abstractmethod
+    def start(self, url):
+        """Start playing url"""
+
+    @abstractmethod
+    def stop(self):
+        """Stop playback and release the process"""
+
+    def pause(self):
+        # without in-place control pausing means dropping the stream
+        self.stop()
+        self.is_paused = True
+        return True
+
+    def resume(self):
+        self.start(self.url)
+        self.is_paused = False
+        return True
+
+    def toggle(self):
+        if self.is_paused or not self.is_running:
+            self.resume()
+        else:
+            self.pause()
+
+    def set_volume(self, volume):
+        """Default: apply the new volume with a restart"""
+        self.volume = volume
+        if self.is_running:
+            self.stop()
+            self.start(self.url)
+        return True
+
+    def switch(self, url):
+        """Default: restart with the new url"""
+        self.stop()
+        self.start(url)
+
+    def now_playing(self):
+        """Current stream title, None when the backend can not tell"""
+        return None
+
+    def throughput(self):
+        """Measured input rate in kbit/s, None when the backend can not tell"""
+        return None
+
+
+# built-in backends are imported only when selected
+_BACKENDS = {
+    "ffplay": "radioactive.ffplay:Ffplay",
+    "mpv": "radioactive.mpv:MPV",
+    "vlc": "radioactive.vlc:VLC",
+    "embedded": "radioactive.embedded:EmbeddedPlayer",
+}
+
+
+def register_backend(name, backend=None):
+    """Register a backend class or a 'module:Class' path, usable as decorator"""
+    if backend is None:
+
+        def _decorator(cls):
+            _BACKENDS[name] = cls
+            return cls
+
+        return _decorator
+    _BACKENDS[name] = backend
+    return backend
+
+
+def available_backends():
+    return sorted(_BACKENDS)
+
+
+def get_backend(name):
+    backend = _BACKENDS.get(name)
+    if isinstance(backend, str):
+        module_name, class_name = backend.split(":")
+        backend = getattr(importlib.import_module(module_name), class_name)
+        _BACKENDS[name] = backend
+    return backend
+
+
+def create_player(name, volume=None, loglevel="info"):
+    """Instantiate the backend registered under name, None if unknown"""
+    backend = get_backend(name)
+    if backend is None:
+        log.debug(f"No player backend named {name}, have: {available_backends()}")
+        return None
+    return backend(volume=volume, loglevel=loglevel)
@@ -0,0 +1,207 @@
+"""Fetching and parsing of .pls / .m3u playlists published by broadcasters.
+
+resolve_stream() turns a playlist URL into a stream URL: the entries are
+raced in parallel for the first byte and the winner is cached per station
+(~/.radio-active-resolved) so the next start connects straight to it. HLS
+master manifests resolve to their variants, HLS media playlists are passed
+to the player as they are.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urljoin, urlparse
+
+import requests
+from zenlog import log
+
+from radioactive.metrics import metrics
+from radioactive.storage import update_json
+
+PLAYLIST_EXTENSIONS = (".pls", ".m3u", ".m3u8")
+RESOLVED_CACHE_TTL = 24 * 60 * 60  # 1 day
+# most playlists list a handful of mirrors, never open more at once
+RACE_WORKERS = 8
+
+_BANDWIDTH_RE = re.compile(r"[:,]BANDWIDTH=(\d+)")
+
+
+def is_playlist_url(url):
+    return urlparse(url).path.lower().endswith(PLAYLIST_EXTENSIONS)
+
+
+def parse_pls(text):
+    entries = []
+    for line in text.splitlines():
+        key, _, value = line.strip().partition("=")
+        if key.lower().startswith("file") and value:
+            entries.append(value.strip())
+    return entries
+
+
+def parse_m3u(text):
+    return [
+        line.strip()
+        for line in text.splitlines()
+        if line.strip() and not line.startswith("#")
+    ]
+
+
+def parse_hls_master(text, base_url=""):
+    """Variants of an HLS master manifest as (bandwidth, url), best first"""
+    variants = []
+    bandwidth = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-STREAM-INF"):
+            match = _BANDWIDTH_RE.search(line)
+            bandwidth = int(match.group(1)) if match else 0
+        elif line and not line.startswith("#") and bandwidth is not None:
+            variants.append((bandwidth, urljoin(base_url, line)))
+            bandwidth = None
+    return sorted(variants, key=lambda v: v[0], reverse=True)
+
+
+def parse_playlist(text, base_url=""):
+    """Stream URLs listed in a playlist, relative entries made absolute"""
+    if text.lstrip().lower().startswith("[playlist]"):
+        entries = parse_pls(text)
+    else:
+        entries = parse_m3u(text)
+    return [urljoin(base_url, entry) for entry in entries]
+
+
+def _fetch(url, timeout=5):
+    """(kind, [(kbps, url)]) of a playlist, kind is hls, stream or playlist.
+
+    kbps is only known for HLS variants, None otherwise.
+    """
+    try:
+        response = requests.get(url, timeout=timeout)
+        response.raise_for_status()
+        text = response.text
+    except Exception as e:
+        log.debug(f"Could not fetch playlist {url}: {e}")
+        return "playlist", []
+    if "#EXT-X-STREAM-INF" in text:
+        return "hls", [(bw // 1000, v) for bw, v in parse_hls_master(text, url)]
+    if "#EXT-X-TARGETDURATION" in text:
+        # an HLS media playlist is the stream itself
+        return "stream", [(None, url)]
+    return "playlist", [(None, entry) for entry in parse_playlist(text, url)]
+
+
+def fetch_playlist(url, timeout=5):
+    """Download and parse a playlist, empty list on any failure"""
+    return [entry for _, entry in _fetch(url, timeout)[1]]
+
+
+def fetch_variants(url, timeout=5):
+    """Entries of a playlist as (kbps, url), kbps None when unknown"""
+    return _fetch(url, timeout)[1]
+
+
+def first_byte_time(url, timeout=5):
+    """Seconds until the first byte of url arrives, None if it fails"""
+    started = time.time()
+    try:
+        with requests.get(url, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            if not response.raw.read(1):
+                return None
+        return time.time() - started
+    except Exception as e:
+        log.debug(f"Race: {url} failed: {e}")
+        return None
+
+
+def race(urls, timeout=5):
+    """The first of urls to deliver a byte, None if none does"""
+    if not urls:
+        return None
+    pool = ThreadPoolExecutor(max_workers=min(RACE_WORKERS, len(urls)))
+    pending = {pool.submit(first_byte_time, url, timeout): url for url in urls}
+    winner = None
+    try:
+        while pending and winner is None:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = pending.pop(future)
+                if winner is None and future.result() is not None:
+                    winner = url
+    finally:
+        # probes not started yet are dropped, running ones finish on their own
+        pool.shutdown(wait=False, cancel_futures=True)
+    return winner
+
+
+class ResolvedCache:
+    """Playlist (per station) -> stream URL that answered first"""
+
+    def __init__(self, ttl=RESOLVED_CACHE_TTL):
+        self.ttl = ttl
+        self.cache_path = os.path.join(
+            os.path.expanduser("~"), ".radio-active-resolved"
+        )
+        self.entries = None
+        self.lock = threading.Lock()
+
+    def _load(self):
+        if self.entries is not None:
+            return
+        try:
+            with open(self.cache_path, "r") as f:
+                self.entries = json.load(f)
+        except Exception:
+            self.entries = {}
+
+    def get(self, key):
+        with self.lock:
+            self._load()
+            entry = self.entries.get(key)
+            hit = bool(entry) and time.time() - entry.get("time", 0) <= self.ttl
+            metrics.cache("resolved", hit)
+            return entry.get("url") if hit else None
+
+    def set(self, key, url):
+        with self.lock:
+            self._load()
+            entry = {"url": url, "time": int(time.time())}
+            self.entries[key] = entry
+            try:
+                self.entries = update_json(
+                    self.cache_path, lambda entries: entries.__setitem__(key, entry)
+                )
+            except Exception as e:
+                log.debug(f"Resolved cache: could not save: {e}")
+
+
+resolved_cache = ResolvedCache()
+
+
+def resolve_stream(url, key=None):
+    """Stream URL to play for url; playlists resolve to their fastest entry"""
+    if not is_playlist_url(url):
+        return url
+    key = f"{key}|{url}" if key else url
+    cached = resolved_cache.get(key)
+    if cached:
+        log.debug(f"Resolved (cached): {url} -> {cached}")
+        return cached
+
+    kind, variants = _fetch(url)
+    entries = [entry for _, entry in variants]
+    if not entries:
+        return url
+    if kind == "hls":
+        # HLS variants are qualities, not mirrors: keep the best one
+        entries = entries[:1]
+    winner = race(entries) if len(entries) > 1 else entries[0]
+    if winner is None:
+        return url
+    log.debug(f"Resolved: {url} -> {winner}")
+    resolved_cache.set(key, winner)
+    return winner
@@ -0,0 +1,132 @@
+"""Post-recording processing: transcode, loudness normalise and tag.
+
+Recordings are captured with a stream copy, which costs next to nothing
+during the live session. Finished files are queued to a small process pool
+running at a lower priority where ffmpeg does the heavy lifting.
+"""
+
+import atexit
+import multiprocessing
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+from zenlog import log
+
+# encoder to use when a file has to be re-encoded into a given container
+ENCODERS = {
+    "mp3": "libmp3lame",
+    "aac": "aac",
+    "ogg": "libvorbis",
+    "opus": "libopus",
+    "flac": "flac",
+}
+
+# EBU R128 single pass: integrated loudness, true peak, loudness range
+LOUDNORM_FILTER = "loudnorm=I=-16:TP=-1.5:LRA=11"
+
+
+def _lower_priority(nice):
+    try:
+        if os.name == "nt":
+            import psutil
+
+            psutil.Process().nice(psutil.BELOW_NORMAL_PRIORITY_CLASS)
+        elif nice:
+            os.nice(int(nice))
+    except Exception as e:
+        log.debug(f"postprocess: could not lower priority: {e}")
+
+
+def build_postprocess_cmd(job, output_file):
+    """ffmpeg command for a job dict (see PostProcessor.submit)"""
+    in_ext = os.path.splitext(job["input"])[1].lstrip(".").lower()
+    out_ext = job["format"]
+    cmd = ["ffmpeg", "-nostdin", "-y", "-v", "error", "-i", job["input"], "-vn"]
+    if job["loudnorm"]:
+        cmd += ["-af", LOUDNORM_FILTER]
+    if job["loudnorm"] or in_ext != out_ext:
+        cmd += ["-c:a", ENCODERS.get(out_ext, "libmp3lame")]
+    else:
+        cmd += ["-c:a", "copy"]
+    for key, value in job.get("tags", {}).items():
+        if value:
+            cmd += ["-metadata", f"{key}={value}"]
+    cmd.append(output_file)
+    return cmd
+
+
+def process_recording(job):
+    """Runs inside a pool worker. Returns the path of the final file."""
+    base = os.path.splitext(job["input"])[0]
+    output_file = f"{base}.{job['format']}"
+    # write next to the target first, never leave a half written recording
+    tmp_file = f"{base}.part.{job['format']}"
+    cmd = build_postprocess_cmd(job, tmp_file)
+    subprocess.run(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    os.replace(tmp_file, output_file)
+    if output_file != job["input"]:
+        os.remove(job["input"])
+    return output_file
+
+
+class PostProcessor:
+    """Queues finished recordings to a low priority process pool"""
+
+    def __init__(self, workers=1, nice=10, loudnorm=True):
+        self.workers = max(1, int(workers))
+        self.nice = nice
+        self.loudnorm = loudnorm
+        self.executor = None
+        self.pending = set()
+
+    def _ensure_executor(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                # fork is unsafe with the UI and reader threads around
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_lower_priority,
+                initargs=(self.nice,),
+            )
+            atexit.register(self.shutdown)
+        return self.executor
+
+    def submit(self, input_file, target_format, tags=None, on_done=None):
+        """Queue input_file to be converted to target_format and tagged"""
+        job = {
+            "input": input_file,
+            "format": target_format,
+            "loudnorm": self.loudnorm,
+            "tags": tags or {},
+        }
+        future = self._ensure_executor().submit(process_recording, job)
+        self.pending.add(future)
+
+        def _done(fut):
+            self.pending.discard(fut)
+            try:
+                output_file = fut.result()
+                log.debug(f"postprocess: finished {output_file}")
+            except Exception as e:
+                output_file = None
+                log.debug(f"postprocess: failed for {input_file}: {e}")
+            if on_done is not None:
+                on_done(input_file, output_file)
+
+        future.add_done_callback(_done)
+        return future
+
+    def shutdown(self):
+        if self.executor is None:
+            return
+        if self.pending:
+            log.info(f"Finishing post-processing of {len(self.pending)} recording(s)…")
+        self.executor.shutdown(wait=True)
+        self.executor = None
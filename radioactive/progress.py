@@ -0,0 +1,178 @@
+"""Shared reader for ffmpeg '-progress pipe:1' output.
+
+One background thread multiplexes the stdout pipes of all recorders with
+selectors and publishes structured snapshots to a store. The UI samples the
+store at its own refresh rate instead of being pushed an update per line.
+"""
+
+import os
+import selectors
+import threading
+import time
+
+from zenlog import log
+
+from radioactive.metrics import metrics
+
+
+class ProgressStore:
+    """Latest progress snapshot per recording, safe to read from any thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots = {}
+
+    def publish(self, key, snapshot):
+        with self._lock:
+            self._snapshots[key] = snapshot
+        metrics.set("radioactive_recording_bytes", snapshot["size"], recording=key)
+        try:
+            speed = float(snapshot["speed"].rstrip("x"))
+            metrics.set("radioactive_recording_speed", speed, recording=key)
+        except (AttributeError, ValueError):
+            pass
+
+    def get(self, key):
+        with self._lock:
+            return self._snapshots.get(key)
+
+    def remove(self, key):
+        with self._lock:
+            self._snapshots.pop(key, None)
+        metrics.remove("radioactive_recording_bytes", recording=key)
+        metrics.remove("radioactive_recording_speed", recording=key)
+
+
+def _parse_size(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def make_snapshot(block, finished=False):
+    """Convert one ffmpeg progress block (key=value pairs) to a snapshot"""
+    return {
+        "elapsed": block.get("out_time", ""),
+        "size": _parse_size(block.get("total_size")),
+        "bitrate": block.get("bitrate", ""),
+        "speed": block.get("speed", ""),
+        "finished": finished or block.get("progress") == "end",
+        "updated": time.time(),
+    }
+
+
+class _PipeState:
+    def __init__(self, key):
+        self.key = key
+        self.pending = b""
+        self.block = {}
+
+
+class ProgressReader:
+    """Multiplexes recorder progress pipes over a single thread"""
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._thread = None
+        self._selector = None
+        self._new_pipes = []
+        self._wake_r = self._wake_w = None
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def watch(self, key, stream):
+        """Start publishing progress read from stream (a binary pipe) under key"""
+        if os.name == "nt":
+            # selectors can not wait on pipes on Windows
+            threading.Thread(
+                target=self._read_blocking, args=(key, stream), daemon=True
+            ).start()
+            return
+        with self._lock:
+            self._ensure_thread()
+            self._new_pipes.append((key, stream))
+        os.write(self._wake_w, b"\0")
+
+    def _register_new_pipes(self):
+        with self._lock:
+            new_pipes, self._new_pipes = self._new_pipes, []
+        for key, stream in new_pipes:
+            fd = stream.fileno()
+            os.set_blocking(fd, False)
+            self._selector.register(fd, selectors.EVENT_READ, _PipeState(key))
+
+    def _run(self):
+        while True:
+            try:
+                events = self._selector.select()
+            except Exception as e:
+                log.debug(f"progress reader: {e}")
+                time.sleep(0.5)
+                continue
+            for selector_key, _ in events:
+                state = selector_key.data
+                if state is None:
+                    try:
+                        os.read(self._wake_r, 512)
+                    except BlockingIOError:
+                        pass
+                    self._register_new_pipes()
+                    continue
+                self._read_ready(selector_key.fd, state)
+
+    def _read_ready(self, fd, state):
+        try:
+            data = os.read(fd, 65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._selector.unregister(fd)
+            self._finish(state)
+            return
+        lines = (state.pending + data).split(b"\n")
+        state.pending = lines.pop()
+        for line in lines:
+            self._feed(state, line.decode("utf8", "replace"))
+
+    def _read_blocking(self, key, stream):
+        state = _PipeState(key)
+        try:
+            for line in iter(stream.readline, b""):
+                self._feed(state, line.decode("utf8", "replace"))
+        except Exception as e:
+            log.debug(f"progress reader: {e}")
+        self._finish(state)
+
+    def _feed(self, state, line):
+        line = line.strip()
+        if "=" not in line:
+            return
+        k, v = line.split("=", 1)
+        state.block[k] = v
+        if k == "progress":
+            # one snapshot per progress marker, fields carry over between blocks
+            self.store.publish(state.key, make_snapshot(state.block))
+
+    def _finish(self, state):
+        last = self.store.get(state.key)
+        if last is not None:
+            last = dict(last, finished=True)
+        else:
+            last = make_snapshot(state.block, finished=True)
+        self.store.publish(state.key, last)
+
+
+progress_store = ProgressStore()
+progress_reader = ProgressReader(progress_store)
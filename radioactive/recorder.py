@@ -1,7 +1,114 @@
+import json
+import os
 import subprocess
+import time
 
 from zenlog import log
 
+from radioactive.metrics import metrics
+from radioactive.runtime import register_process, unregister_process
+from radioactive.storage import update_json
+
+# radio-browser reports codecs in upper case and sometimes with a profile
+# suffix ("AAC+"), map them to the names ffprobe would give us. Values that
+# are not listed here (e.g. "UNKNOWN") are resolved by probing the stream.
+_STATION_CODECS = {
+    "MP3": "mp3",
+    "AAC": "aac",
+    "AAC+": "aac",
+    "OGG": "ogg",
+    "OPUS": "opus",
+    "FLAC": "flac",
+}
+
+# codecs whose name is not usable as a file extension for a stream copy
+_CODEC_EXTENSIONS = {
+    "vorbis": "ogg",
+}
+
+CODEC_CACHE_TTL = 7 * 24 * 60 * 60  # seconds
+
+
+class CodecCache:
+    """Persistent stream URL -> codec map, so we probe a station only once"""
+
+    def __init__(self, ttl=CODEC_CACHE_TTL):
+        self.ttl = ttl
+        self.cache_path = os.path.join(
+            os.path.expanduser("~"), ".radio-active-codec-cache"
+        )
+        self.entries = None
+
+    def _load(self):
+        if self.entries is not None:
+            return
+        try:
+            with open(self.cache_path, "r") as f:
+                self.entries = json.load(f)
+        except Exception:
+            self.entries = {}
+
+    def get(self, url):
+        self._load()
+        entry = self.entries.get(url)
+        if not entry:
+            metrics.cache("codec", False)
+            return None
+        if time.time() - entry.get("time", 0) > self.ttl:
+            log.debug(f"Codec cache: expired entry for {url}")
+            metrics.cache("codec", False)
+            return None
+        metrics.cache("codec", True)
+        return entry.get("codec")
+
+    def set(self, url, codec):
+        self._load()
+        entry = {"codec": codec, "time": int(time.time())}
+        self.entries[url] = entry
+        try:
+            # merged with what other instances wrote meanwhile
+            self.entries = update_json(
+                self.cache_path, lambda entries: entries.__setitem__(url, entry)
+            )
+        except Exception as e:
+            log.debug(f"Codec cache: could not save: {e}")
+
+
+codec_cache = CodecCache()
+
+
+def codec_from_station_info(station_info, url):
+    """Codec from a radio-browser station record, if it describes this url"""
+    if not isinstance(station_info, dict):
+        return None
+    if url not in (station_info.get("url"), station_info.get("url_resolved")):
+        return None
+    codec = str(station_info.get("codec") or "").strip().upper()
+    return _STATION_CODECS.get(codec)
+
+
+def resolve_stream_codec(input_stream_url, station_info=None):
+    """Find the codec of a stream without blocking when we already know it.
+
+    Lookup order: station metadata from the API, the persistent codec cache
+    and finally an ffprobe run against the stream (result gets cached).
+    """
+    codec = codec_from_station_info(station_info, input_stream_url)
+    if codec:
+        log.debug(f"Codec: {codec} from station metadata")
+        return codec
+
+    codec = codec_cache.get(input_stream_url)
+    if codec:
+        log.debug(f"Codec: {codec} from cache")
+        return codec
+
+    codec = record_audio_auto_codec(input_stream_url)
+    if codec:
+        codec = _CODEC_EXTENSIONS.get(codec, codec)
+        codec_cache.set(input_stream_url, codec)
+    return codec
+
 
 def record_audio_auto_codec(input_stream_url):
     try:
@@ -38,6 +145,7 @@ def record_audio_from_url(input_url, output_file, force_mp3, loglevel):
         log.error("Failed to start recorder")
         return
     proc.wait()
+    unregister_process(proc)
     log.info("Audio recorded successfully.")
 
 
@@ -69,6 +177,7 @@ def start_recording_process(input_url, output_file, force_mp3, loglevel):
         cmd = _build_ffmpeg_cmd(input_url, output_file, force_mp3, loglevel)
         # Silence output to keep UI clean (unless debug)
         # Always capture stdout for -progress parsing; suppress stderr unless debug
+        # stdout stays binary, radioactive.progress reads it without blocking
         stdout = subprocess.PIPE
         stderr = subprocess.PIPE if loglevel == "debug" else subprocess.DEVNULL
         proc = subprocess.Popen(
@@ -76,11 +185,9 @@ def start_recording_process(input_url, output_file, force_mp3, loglevel):
             stdin=subprocess.DEVNULL,
             stdout=stdout,
             stderr=stderr,
-            text=True,
-            bufsize=1,
-            universal_newlines=True,
         )
         log.debug(f"Record start PID={proc.pid}")
+        register_process(proc, "recorder")
         return proc
     except Exception as e:
         log.error(f"Failed to start recording: {e}")
@@ -97,3 +204,4 @@ def stop_recording_process(proc):
                 proc.kill()
     except Exception:
         pass
+    unregister_process(proc)
@@ -0,0 +1,116 @@
+"""Registry of the player and recorder processes started by radio-active.
+
+Every spawned process gets a small JSON file in ~/.radio-active-run named
+after its PID, holding its start time. `--kill` walks only these entries and
+checks the start time before terminating, so a reused PID or an ffplay that
+radio-active does not own is never touched. Entries of processes that are
+gone are removed along the way.
+"""
+
+import json
+import os
+
+import psutil
+from zenlog import log
+
+from radioactive.storage import atomic_write
+
+RUN_DIR = os.path.join(os.path.expanduser("~"), ".radio-active-run")
+
+# psutil reports create_time as float seconds, allow for rounding
+_TIME_TOLERANCE = 0.05
+
+
+def _entry_path(pid):
+    return os.path.join(RUN_DIR, f"{pid}.json")
+
+
+def _create_time(pid):
+    try:
+        return psutil.Process(pid).create_time()
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return None
+
+
+def register_process(proc, kind):
+    """Record a spawned Popen (kind is e.g. 'player:ffplay' or 'recorder')"""
+    if proc is None:
+        return
+    entry = {
+        "pid": proc.pid,
+        "kind": kind,
+        "create_time": _create_time(proc.pid),
+        "owner": os.getpid(),
+    }
+    try:
+        os.makedirs(RUN_DIR, exist_ok=True)
+        atomic_write(_entry_path(proc.pid), json.dumps(entry))
+    except Exception as e:
+        log.debug(f"Could not register PID {proc.pid}: {e}")
+
+
+def unregister_process(proc):
+    # in-process recorders have no PID
+    pid = getattr(proc, "pid", None)
+    if pid is None:
+        return
+    try:
+        os.remove(_entry_path(pid))
+    except OSError:
+        pass
+
+
+def registered_processes():
+    """Entries whose process still runs; stale ones are removed"""
+    try:
+        names = os.listdir(RUN_DIR)
+    except OSError:
+        return []
+    entries = []
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(RUN_DIR, name)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            created = _create_time(entry["pid"])
+            expected = entry.get("create_time")
+            alive = created is not None and (
+                expected is None or abs(created - expected) < _TIME_TOLERANCE
+            )
+        except Exception as e:
+            log.debug(f"Bad registry entry {name}: {e}")
+            alive = False
+        if alive:
+            entries.append(entry)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    return entries
+
+
+def kill_registered_processes(timeout=3):
+    """Terminate every live registered process, returns how many"""
+    count = 0
+    for entry in registered_processes():
+        pid = entry["pid"]
+        try:
+            p = psutil.Process(pid)
+            p.terminate()
+            try:
+                p.wait(timeout=timeout)
+            except psutil.TimeoutExpired:
+                log.debug(f"Forcefully killing {entry['kind']} process with PID {pid}")
+                p.kill()
+            count += 1
+            log.info(f"Terminated {entry['kind']} process with PID {pid}")
+        except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
+            log.debug(f"Could not terminate PID {pid}: {e}")
+        try:
+            os.remove(_entry_path(pid))
+        except OSError:
+            pass
+    return count
@@ -0,0 +1,155 @@
+"""Crash-safe writes and advisory locking for the files under ~.
+
+atomic_write() writes to a temporary file in the same directory, fsyncs it
+and renames it over the target, so readers see either the old or the new
+content, never a truncated file. file_lock() takes an exclusive advisory
+lock on "<path>.lock" (fcntl on POSIX, msvcrt on Windows) so several
+radio-active instances can do read-modify-write cycles without losing
+each other's updates; after LOCK_TIMEOUT seconds it goes on without it.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from zenlog import log
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# give up waiting for a lock after this long and go on without it
+LOCK_TIMEOUT = 10
+
+# new files get the mode open() would give them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+# locks held by the current thread, a nested file_lock() must not wait on itself
+_held = threading.local()
+
+
+def atomic_write(path, data):
+    """Replace path with data (str or bytes) in one step"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix="." + os.path.basename(path) + ".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data.encode("utf8") if isinstance(data, str) else data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600, keep the mode of the file being replaced
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except OSError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        # make the rename itself durable
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
+
+def _try_lock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+
+
+def _lock(f):
+    if fcntl is None and msvcrt is None:
+        return False
+    deadline = time.time() + LOCK_TIMEOUT
+    while True:
+        try:
+            _try_lock(f)
+            return True
+        except OSError:
+            if time.time() > deadline:
+                return False
+            time.sleep(0.05)
+
+
+def _unlock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive advisory lock for path, held for the with block"""
+    key = os.path.abspath(path)
+    held = getattr(_held, "paths", None)
+    if held is None:
+        held = _held.paths = set()
+    if key in held:
+        yield
+        return
+    lock_file = None
+    locked = False
+    try:
+        lock_file = open(path + ".lock", "a+")
+        locked = _lock(lock_file)
+        if not locked:
+            log.debug(f"Timed out waiting for the lock on {path}")
+    except Exception as e:
+        log.debug(f"Could not lock {path}: {e}")
+    held.add(key)
+    try:
+        yield
+    finally:
+        held.discard(key)
+        if lock_file is not None:
+            if locked:
+                try:
+                    _unlock(lock_file)
+                except Exception:
+                    pass
+            lock_file.close()
+
+
+def read_json(path, default=None):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception:
+        return default
+
+
+def update_json(path, update, default=dict):
+    """Locked read-modify-write of a JSON file; update(data) edits in place"""
+    with file_lock(path):
+        data = read_json(path)
+        if data is None:
+            data = default()
+        update(data)
+        atomic_write(path, json.dumps(data))
+    return data
@@ -0,0 +1,185 @@
+"""Common supervisor for external player processes.
+
+Players either get their output routed to DEVNULL or drained continuously by
+bounded readers, so a chatty player can never fill a pipe buffer and freeze.
+Drained lines are classified into structured events (errors, buffering,
+bitrate, audio playing) and only a short history is kept; for players that
+only print errors (ffplay -loglevel error) every stderr line but the status
+line is an error. Backends watched over IPC instead of their output report
+the same events with emit(). A waiter thread blocks in wait() and reports
+the exit right away: "exit" after expect_exit(), "crash" when the player
+died on its own.
+"""
+
+import re
+import subprocess
+import threading
+import time
+from collections import deque, namedtuple
+
+from zenlog import log
+
+from radioactive.runtime import register_process, unregister_process
+
+PlayerEvent = namedtuple("PlayerEvent", ["kind", "message", "value", "time"])
+
+# longest line we keep, anything beyond is dropped while draining
+MAX_LINE = 4096
+_CHUNK = 65536
+
+_ERROR_RE = re.compile(
+    r"error|failed|could not|cannot|connection refused|"
+    r"server returned|invalid data|no such file|timed out",
+    re.IGNORECASE,
+)
+_BUFFERING_RE = re.compile(
+    r"buffering|cache is not responding|underrun|paused for cache|stalled",
+    re.IGNORECASE,
+)
+_BITRATE_RE = re.compile(r"(\d+(?:\.\d+)?)\s*kb(?:it)?/s", re.IGNORECASE)
+# ffplay status line, printed once audio is being played
+_PLAYING_RE = re.compile(r"\b(?:M-A|A-V):\s*-?\d")
+# any ffplay status line, including the ones before the first audio
+_STATUS_RE = re.compile(r"\b(?:M-A|M-V|A-V):")
+
+
+def parse_player_line(line):
+    """Classify one line of player output, None if it is just noise"""
+    now = time.time()
+    if _ERROR_RE.search(line):
+        return PlayerEvent("error", line, None, now)
+    if _BUFFERING_RE.search(line):
+        return PlayerEvent("buffering", line, None, now)
+    if _PLAYING_RE.search(line):
+        return PlayerEvent("playing", line, None, now)
+    match = _BITRATE_RE.search(line)
+    if match:
+        return PlayerEvent("bitrate", line, float(match.group(1)), now)
+    return None
+
+
+class PlayerSupervisor:
+    """Spawns a player and keeps its output pipes drained"""
+
+    def __init__(self, name, on_event=None, history=50, stderr_errors=False):
+        self.name = name
+        self.on_event = on_event
+        # the player only writes errors (and status lines) to stderr
+        self.stderr_errors = stderr_errors
+        self.events = deque(maxlen=history)
+        self.lines = deque(maxlen=history)
+        self.bytes_drained = 0
+        self.process = None
+        self.returncode = None
+        self.stopping = False
+        # status lines repeat many times a second, only the first is reported
+        self.playing = False
+        self._lock = threading.Lock()
+
+    def spawn(self, cmd, capture=False):
+        """Start cmd; with capture=False its output goes to DEVNULL"""
+        pipe = subprocess.PIPE if capture else subprocess.DEVNULL
+        self.process = subprocess.Popen(
+            cmd,
+            shell=False,
+            stdin=subprocess.DEVNULL,
+            stdout=pipe,
+            stderr=pipe,
+        )
+        log.debug(f"player: {self.name} => PID {self.process.pid} initiated")
+        register_process(self.process, f"player:{self.name}")
+        if capture:
+            for stream, stderr in (
+                (self.process.stdout, False),
+                (self.process.stderr, True),
+            ):
+                threading.Thread(
+                    target=self._drain, args=(stream, stderr), daemon=True
+                ).start()
+        threading.Thread(target=self._wait, args=(self.process,), daemon=True).start()
+        return self.process
+
+    def expect_exit(self):
+        """Mark the coming exit as requested, it is then not a crash"""
+        self.stopping = True
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def _wait(self, process):
+        try:
+            returncode = process.wait()
+        except Exception as e:
+            log.debug(f"{self.name} waiter: {e}")
+            return
+        self.returncode = returncode
+        unregister_process(process)
+        kind = "exit" if self.stopping else "crash"
+        log.debug(f"player: {self.name} => PID {process.pid} {kind} ({returncode})")
+        self._emit(
+            PlayerEvent(
+                kind, f"{self.name} exited with {returncode}", returncode, time.time()
+            )
+        )
+
+    def _drain(self, stream, stderr=False):
+        pending = b""
+        try:
+            while True:
+                chunk = stream.read1(_CHUNK)
+                if not chunk:
+                    break
+                with self._lock:
+                    self.bytes_drained += len(chunk)
+                # players use \r for status lines, treat it as a line break
+                parts = (pending + chunk).replace(b"\r", b"\n").split(b"\n")
+                pending = parts.pop()[-MAX_LINE:]
+                for part in parts:
+                    if part:
+                        self._handle_line(
+                            part[:MAX_LINE].decode("utf8", "replace"), stderr
+                        )
+        except Exception as e:
+            log.debug(f"{self.name} output reader: {e}")
+        if pending:
+            self._handle_line(pending.decode("utf8", "replace"), stderr)
+
+    def _handle_line(self, line, stderr=False):
+        line = line.strip()
+        if not line:
+            return
+        self.lines.append(line)
+        if stderr and self.stderr_errors:
+            if not _STATUS_RE.search(line):
+                event = PlayerEvent("error", line, None, time.time())
+            elif _PLAYING_RE.search(line):
+                event = PlayerEvent("playing", line, None, time.time())
+            else:
+                event = None
+        else:
+            event = parse_player_line(line)
+        if event is None:
+            return
+        if event.kind == "playing":
+            if self.playing:
+                return
+            self.playing = True
+        self._emit(event)
+
+    def emit(self, kind, message, value=None):
+        """Report an event the backend observed itself (IPC, HTTP status)"""
+        self._emit(PlayerEvent(kind, message, value, time.time()))
+
+    def _emit(self, event):
+        self.events.append(event)
+        if self.on_event is not None:
+            try:
+                self.on_event(event)
+            except Exception as e:
+                log.debug(f"{self.name} event handler: {e}")
+
+    def last_event(self, kind):
+        for event in reversed(self.events):
+            if event.kind == kind:
+                return event
+        return None
@@ -0,0 +1,131 @@
+"""Start-up tracing: where the time goes between choosing a station and audio.
+
+span() times a phase (API lookup, stream resolution, player spawn, ...) and
+mark() records a point in time such as the first audio reported by the
+player. Tracing is off unless enable() was called (--trace-file or
+--loglevel debug); then the per-phase breakdown is logged at debug level
+once audio starts. With a trace file the events are written as JSON lines,
+or in Chrome trace format (chrome://tracing, Perfetto) when the file name
+ends in .json.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from zenlog import log
+
+_enabled = False
+_path = None
+_events = []
+# events up to here were in an earlier breakdown
+_reported = 0
+_lock = threading.Lock()
+_origin = time.perf_counter()
+
+
+def enable(path=None):
+    global _enabled, _path
+    _enabled = True
+    _path = path
+    if path and not path.endswith(".json"):
+        # JSON lines are appended as they come, start with an empty file
+        try:
+            open(path, "w").close()
+        except OSError as e:
+            log.warning(f"Can not write trace file {path}: {e}")
+            _path = None
+    atexit.register(flush)
+
+
+def enabled():
+    return _enabled
+
+
+def _now_us():
+    return int((time.perf_counter() - _origin) * 1e6)
+
+
+def _record(event):
+    event.update({"pid": os.getpid(), "tid": threading.get_ident()})
+    with _lock:
+        _events.append(event)
+        if _path and not _path.endswith(".json"):
+            try:
+                with open(_path, "a") as f:
+                    f.write(json.dumps(event) + "\n")
+            except OSError as e:
+                log.debug(f"trace: {e}")
+
+
+@contextmanager
+def span(name, **args):
+    """Time the with block as phase name"""
+    if not _enabled:
+        yield
+        return
+    start = _now_us()
+    try:
+        yield
+    finally:
+        _record(
+            {
+                "name": name,
+                "ph": "X",
+                "ts": start,
+                "dur": _now_us() - start,
+                "args": args,
+            }
+        )
+
+
+def mark(name, **args):
+    """Record that name happened now"""
+    if _enabled:
+        _record({"name": name, "ph": "i", "s": "g", "ts": _now_us(), "args": args})
+
+
+def breakdown(start=0):
+    """Recorded phases as (name, start_ms, duration_ms), marks have no duration"""
+    with _lock:
+        events = sorted(_events[start:], key=lambda e: e["ts"])
+    return [
+        (e["name"], e["ts"] / 1000, e["dur"] / 1000 if "dur" in e else None)
+        for e in events
+    ]
+
+
+def log_breakdown(title="start-up"):
+    """Log the phases recorded since the previous breakdown"""
+    global _reported
+    if not _enabled:
+        return
+    with _lock:
+        start, _reported = _reported, len(_events)
+    phases = breakdown(start)
+    if not phases:
+        return
+    base = phases[0][1]
+    parts = []
+    for name, start, duration in phases:
+        if duration is None:
+            parts.append(f"{name} @{start - base:.0f}ms")
+        else:
+            parts.append(f"{name} {start - base:.0f}+{duration:.0f}ms")
+    log.debug(f"trace {title}: " + ", ".join(parts))
+
+
+def flush():
+    """Write the Chrome trace file (JSON lines are written as they come)"""
+    if not _path or not _path.endswith(".json"):
+        return
+    with _lock:
+        data = {"traceEvents": list(_events), "displayTimeUnit": "ms"}
+    try:
+        with open(_path, "w") as f:
+            json.dump(data, f)
+    except OSError as e:
+        log.debug(f"trace: {e}")
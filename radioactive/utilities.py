@@ -42,9 +42,23 @@ except Exception:
     tty = None
     select = None
 
+from radioactive import tracing
 from radioactive.ffplay import kill_background_ffplays
+from radioactive.catalog import catalog_call, parse_elapsed
 from radioactive.last_station import Last_station
-from radioactive.recorder import record_audio_auto_codec, record_audio_from_url, start_recording_process, stop_recording_process
+from radioactive.postprocess import PostProcessor
+from radioactive.progress import progress_reader, progress_store
+from radioactive.abr import AdaptiveBitrate
+from radioactive.alias import station_metadata
+from radioactive.failover import FailoverSession
+from radioactive.health import check_favorites, health_rank, is_dead
+from radioactive.metrics import metrics
+from radioactive.playlist import is_playlist_url, resolve_stream
+from radioactive.recorder import record_audio_from_url, resolve_stream_codec, start_recording_process, stop_recording_process
+
+# cached station data of favorites older than this is refreshed, a few per run
+FAVORITE_REFRESH_AGE = 7 * 24 * 3600
+FAVORITE_REFRESH_LIMIT = 20
 
 RED_COLOR = "\033[91m"
 END_COLOR = "\033[0m"
@@ -59,6 +73,15 @@ _global_now_playing_hints = ""
 _global_now_playing_messages: list[str] = []
 # Current stream URL for the Live worker
 _global_now_playing_url = ""
+# Active player, asked for titles when it can report them
+_global_now_playing_player = None
+# candidate streams of the current station, see radioactive.failover
+_failover_session = None
+_abr = None
+# times of automatic restarts after the player died, to back off
+_player_restarts = []
+_PLAYER_MAX_RESTARTS = 3
+_PLAYER_RESTART_WINDOW = 60
 # Optional: a Rich renderable to show in INFO panel instead of plain text lines
 _global_info_renderable = None
 _global_now_playing_input_active = False
@@ -66,7 +89,13 @@ _force_mp3_always = False
 # Recording state
 _rec_proc = None
 _rec_outfile = ""
-_rec_thread = None
+# INFO shows recorder progress until something else is displayed
+_rec_info_visible = False
+# format the recording ends up in and its tags (used by post-processing)
+_rec_target_format = ""
+_rec_tags = {}
+_rec_catalog_id = None
+_postprocessor = None
 # VU meter state
 _vu_meter_levels = []
 _vu_meter_enabled = True
@@ -164,10 +193,27 @@ def _make_header_panel() -> Panel:
     return make_panel(head, title="[ui.title]RADIO-ACTIVE[/]")
 
 
+def _push_vu_level(db_value: float):
+    """Feed one measured level (dBFS) into the VU meter buffer."""
+    global _vu_meter_audio_levels
+    # Convert dB to normalized 1-10 scale for 10 color sections
+    # Reduced sensitivity by 20% (wider dB range: -70dB = 1, -10dB = 10)
+    normalized = int(((db_value + 50) / 60) * 9) + 1
+    normalized = max(1, min(10, normalized))
+
+    # Generate multiple bar values with variation
+    for _ in range(15):
+        variation = randint(-1, 2)
+        level = max(1, min(10, normalized + variation))
+        _vu_meter_audio_levels.append(level)
+
+    # Keep buffer reasonable
+    if len(_vu_meter_audio_levels) > 50:
+        _vu_meter_audio_levels = _vu_meter_audio_levels[-50:]
+
+
 def _analyze_audio_levels(url: str):
     """Background thread to analyze audio levels from the stream using ffmpeg."""
-    global _vu_meter_audio_levels, _vu_meter_is_playing
-    
     # Use ffmpeg to continuously sample audio volume
     cmd = [
         "ffmpeg",
@@ -199,22 +245,7 @@ def _analyze_audio_levels(url: str):
                     try:
                         # Extract dB value (e.g., "mean_volume: -23.5 dB")
                         db_str = line.split("mean_volume:")[1].split("dB")[0].strip()
-                        db_value = float(db_str)
-                        
-                        # Convert dB to normalized 1-10 scale for 10 color sections
-                        # Reduced sensitivity by 20% (wider dB range: -70dB = 1, -10dB = 10)
-                        normalized = int(((db_value + 50) / 60) * 9) + 1
-                        normalized = max(1, min(10, normalized))
-                        
-                        # Generate multiple bar values with variation
-                        for _ in range(15):
-                            variation = randint(-1, 2)
-                            level = max(1, min(10, normalized + variation))
-                            _vu_meter_audio_levels.append(level)
-                        
-                        # Keep buffer reasonable
-                        if len(_vu_meter_audio_levels) > 50:
-                            _vu_meter_audio_levels = _vu_meter_audio_levels[-50:]
+                        _push_vu_level(float(db_str))
                         break
                     except (ValueError, IndexError) as e:
                         log.debug(f"Parse error: {e}")
@@ -306,13 +337,36 @@ def _make_vu_meter() -> Text:
     return vu_text
 
 
+def _format_size(size_b: int) -> str:
+    if size_b >= 1024 * 1024:
+        return f"{size_b/1024/1024:.1f} MiB"
+    elif size_b >= 1024:
+        return f"{size_b/1024:.0f} KiB"
+    return f"{size_b} B"
+
+
+def _recording_info_text() -> str:
+    snap = progress_store.get(_rec_outfile)
+    if snap is None:
+        return f"Recording… to: {_rec_outfile}\n[dim]Press r again to stop[/]"
+    if snap["finished"]:
+        return f"Recording ended: {_rec_outfile}\nelapsed={snap['elapsed']}  size={_format_size(snap['size'])}"
+    return (
+        f"Recording… to: {_rec_outfile}\n"
+        f"elapsed={snap['elapsed']}  size={_format_size(snap['size'])}  "
+        f"bitrate={snap['bitrate']}  speed={snap['speed']}\n[dim]Press r again to stop[/]"
+    )
+
+
 def _make_now_playing_view(station_name: str, track_title: str, hints: str, messages):
     # Header (always visible at top)
     panel_head = _make_header_panel()
     # Station panel
     panel_now = _make_now_playing_panel(station_name, track_title)
     # Info panel below station
-    if _global_info_renderable is not None:
+    if _rec_info_visible:
+        info_body = Text.from_markup(_recording_info_text())
+    elif _global_info_renderable is not None:
         info_body = _global_info_renderable
     else:
         info_body = Text("\n".join(messages) if messages else "")
@@ -341,14 +395,16 @@ def _update_live_view():
 
 
 def set_info_text(text: str):
-    global _global_now_playing_messages, _global_info_renderable
+    global _global_now_playing_messages, _global_info_renderable, _rec_info_visible
+    _rec_info_visible = False
     _global_info_renderable = None
     _global_now_playing_messages = [text.rstrip("\n")] if text else []
     _update_live_view()
 
 
 def set_info_lines(lines: list[str]):
-    global _global_now_playing_messages, _global_info_renderable
+    global _global_now_playing_messages, _global_info_renderable, _rec_info_visible
+    _rec_info_visible = False
     _global_info_renderable = None
     _global_now_playing_messages = [l.rstrip("\n") for l in lines]
     _update_live_view()
@@ -381,6 +437,11 @@ def set_force_mp3(flag: bool):
     _force_mp3_always = bool(flag)
 
 
+def set_postprocess(enabled: bool, workers: int = 1, nice: int = 10, loudnorm: bool = True):
+    global _postprocessor
+    _postprocessor = PostProcessor(workers, nice, loudnorm) if enabled else None
+
+
 def _quick_pick_index(max_n: int, timeout: float = 0.7) -> int | None:
     """Capture numeric keys without Enter; supports multi-digit with a short timeout.
     Returns 0-based index or None to cancel/invalid.
@@ -438,7 +499,8 @@ def _quick_pick_index(max_n: int, timeout: float = 0.7) -> int | None:
 
 
 def set_info_renderable(renderable):
-    global _global_info_renderable
+    global _global_info_renderable, _rec_info_visible
+    _rec_info_visible = False
     _global_info_renderable = renderable
     _update_live_view()
 
@@ -479,6 +541,126 @@ def info_text_input(prompt: str, default: str = "") -> str | None:
         _update_live_view()
 
 
+def _collect_player_metrics(registry):
+    player = _global_now_playing_player
+    if player is not None and hasattr(player, "bytes_received"):
+        registry.set(
+            "radioactive_stream_bytes_total", player.bytes_received, player=player.name
+        )
+
+
+metrics.add_collector(_collect_player_metrics)
+
+
+def set_now_playing_player(player):
+    """Player used by the Live worker to ask for the current title"""
+    global _global_now_playing_player
+    _global_now_playing_player = player
+    if player is not None:
+        player.on_exit = _on_player_exit
+
+
+def start_failover_session(url, handler=None, station_name=""):
+    """Collect the candidate streams of the station behind url.
+
+    Returns the URL to start with (the last working variant if known).
+    A playlist URL is resolved to its fastest entry first; the rest of the
+    playlist and same-name stations are looked up in the background.
+    """
+    global _failover_session, global_current_station_info
+    if _failover_session is not None:
+        _failover_session.close()
+    info = global_current_station_info
+    if not isinstance(info, dict) or url not in (info.get("url"), info.get("url_resolved")):
+        info = {}
+    if is_playlist_url(url) and not info.get("url_resolved"):
+        # like a radio-browser record: url is the playlist, url_resolved the stream
+        info = dict(info, name=info.get("name") or station_name, url=url)
+        info["url_resolved"] = resolve_stream(url, key=info["name"] or None)
+        global_current_station_info = info
+    session = FailoverSession(url, info)
+    _failover_session = session
+    threading.Thread(target=session.discover, args=(handler,), daemon=True).start()
+    session.started(session.first_url)
+    return session.first_url
+
+
+def start_adaptive_bitrate(player):
+    """Follow the measured throughput across the variants of the station"""
+    global _abr
+    if _abr is not None:
+        _abr.stop()
+    _abr = AdaptiveBitrate(player, lambda: _failover_session, _switch_variant)
+    _abr.start()
+
+
+def _switch_variant(url, kbps):
+    global _global_now_playing_url
+    ui_info(f"Switching to the {kbps} kbit/s stream")
+    _global_now_playing_player.switch(url)
+    if _failover_session is not None:
+        _failover_session.started(url)
+    _global_now_playing_url = url
+
+
+def _failover(player, event):
+    """Move to the next candidate stream, False when none is left"""
+    global _global_now_playing_url
+    session = _failover_session
+    if session is None:
+        return False
+    url = session.next_url(player.url)
+    if url is None:
+        # every candidate failed, reconnect with backoff instead
+        session.close()
+        log.debug("failover: no working stream left")
+        return False
+    ui_info(f"Stream failed ({event.kind}), trying {url}")
+    metrics.inc("radioactive_failovers_total", reason=event.kind)
+    if player.is_running:
+        player.stop()
+    sleep(1)
+    # the user may have paused, switched or quit in the meantime
+    if session is not _failover_session or player.is_paused:
+        return True
+    player.start(url)
+    session.started(url)
+    _global_now_playing_url = url
+    return True
+
+
+def _on_player_exit(player, event):
+    """Recover after the player stopped or stalled (runs on a player thread)"""
+    if _failover(player, event):
+        return
+    now = time.time()
+    recent = [t for t in _player_restarts if now - t < _PLAYER_RESTART_WINDOW]
+    if len(recent) >= _PLAYER_MAX_RESTARTS:
+        ui_error("Player keeps stopping, press p to try again")
+        return
+    recent.append(now)
+    _player_restarts[:] = recent
+    metrics.inc("radioactive_player_restarts_total", reason=event.kind)
+    ui_info(f"Player stopped unexpectedly, reconnecting ({len(recent)}/{_PLAYER_MAX_RESTARTS})")
+    sleep(len(recent))
+    # the user may have paused, switched or quit in the meantime
+    if player.is_running or player.is_paused or player.url is None:
+        return
+    player.start(player.url)
+
+
+def _player_title():
+    """Title from the player itself (no extra ffprobe), None if unsupported"""
+    player = _global_now_playing_player
+    if player is None or not player.supports_now_playing:
+        return None
+    try:
+        return player.now_playing()
+    except Exception as e:
+        log.debug(f"player title error: {e}")
+        return None
+
+
 def start_now_playing_live(station_name: str, target_url: str, interval_seconds: int = 15) -> Live:
     """Start Live UI and a background worker that updates song title."""
     global _global_now_playing_live, _global_now_playing_station, _global_now_playing_title
@@ -491,17 +673,29 @@ def start_now_playing_live(station_name: str, target_url: str, interval_seconds:
     _global_now_playing_messages = []
     _global_now_playing_url = target_url or ""
 
-    # Ensure minimal station info is available for the Info panel
+    # Ensure minimal station info is available for the Info panel,
+    # keep the full API record if it belongs to this stream
     try:
-        global_current_station_info = {
-            "name": station_name or "Unknown Station",
-            "url": target_url or "",
-        }
+        if not isinstance(global_current_station_info, dict) or target_url not in (
+            global_current_station_info.get("url"),
+            global_current_station_info.get("url_resolved"),
+        ):
+            global_current_station_info = {
+                "name": station_name or "Unknown Station",
+                "url": target_url or "",
+            }
     except Exception:
         pass
 
-    # Start audio analysis thread for VU meter
-    if _vu_meter_enabled and target_url:
+    # Start audio analysis for VU meter: an in-process player measures its
+    # own PCM, anything else gets a sampling ffmpeg next to it
+    player = _global_now_playing_player
+    if _vu_meter_enabled and getattr(player, "supports_pcm_tap", False):
+        from radioactive.embedded import LevelSink
+
+        _vu_meter_audio_levels = []
+        player.add_sink(LevelSink(_push_vu_level))
+    elif _vu_meter_enabled and target_url:
         _vu_meter_audio_levels = []
         _vu_meter_audio_thread = threading.Thread(
             target=_analyze_audio_levels, 
@@ -560,9 +754,14 @@ def start_now_playing_live(station_name: str, target_url: str, interval_seconds:
                 # Only check for new song title every 'interval' seconds
                 title_check_counter += 1
                 if title_check_counter >= title_check_interval:
-                    title = get_song_title(url)
+                    title = _player_title()
+                    if title is None:
+                        title = get_song_title(url)
                     if title and title != last_title:
                         _global_now_playing_title = title
+                        metrics.inc("radioactive_title_changes_total")
+                        if _rec_catalog_id:
+                            catalog_call("add_track", _rec_catalog_id, title)
                         _update_live_view()
                         last_title = title
                     title_check_counter = 0
@@ -619,14 +818,15 @@ def handle_record(
     record_file_format,  # auto/mp3
     loglevel,
 ):
-    global _rec_proc, _rec_outfile
+    global _rec_proc, _rec_outfile, _rec_info_visible, _rec_target_format, _rec_tags, _rec_catalog_id
     # Toggle: if already recording, stop
     try:
-        if _rec_proc is not None and _rec_proc.poll() is None:
-            stop_recording_process(_rec_proc)
-            _rec_proc = None
-            ui_info(f"Recording stopped: {_rec_outfile}")
-            return
+        if _rec_proc is not None:
+            still_running = _rec_proc.poll() is None
+            stop_active_recording()
+            if still_running:
+                ui_info(f"Recording stopped: {_rec_outfile}")
+                return
     except Exception:
         pass
 
@@ -642,7 +842,7 @@ def handle_record(
         force_mp3 = True
     elif record_file_format == "auto":
         log.debug("Codec: fetching stream codec")
-        codec = record_audio_auto_codec(target_url)
+        codec = resolve_stream_codec(target_url, global_current_station_info)
         if codec is None:
             record_file_format = "mp3"  # default to mp3
             force_mp3 = True
@@ -655,6 +855,16 @@ def handle_record(
         # it is better to leave it on libmp3lame
         force_mp3 = True
 
+    # With post-processing the live session only copies the stream,
+    # the pool converts to the requested format after stopping
+    _rec_target_format = record_file_format
+    if _postprocessor is not None and force_mp3 and record_file_format == "mp3":
+        codec = resolve_stream_codec(target_url, global_current_station_info)
+        if codec:
+            log.debug(f"Postprocess: recording {codec} with stream copy")
+            record_file_format = codec
+            force_mp3 = False
+
     # Normalize target path (fix Linux-style path on Windows)
     if record_file_path:
         record_file_path = _normalize_record_path(record_file_path)
@@ -695,54 +905,111 @@ def handle_record(
     except Exception:
         pass
 
-    _rec_proc = start_recording_process(target_url, outfile_path, force_mp3, loglevel)
+    player = _global_now_playing_player
+    if getattr(player, "supports_pcm_tap", False) and player.is_running:
+        # encode what the player already decodes, no second connection
+        try:
+            _rec_proc = player.record_to(outfile_path)
+        except Exception as e:
+            log.debug(f"embedded recorder: {e}")
+            _rec_proc = None
+    else:
+        _rec_proc = start_recording_process(
+            target_url, outfile_path, force_mp3, loglevel
+        )
     _rec_outfile = outfile_path
+    _rec_tags = {
+        "artist": curr_station_name.strip(),
+        "title": record_file,
+        "date": datetime.date.today().isoformat(),
+        "comment": target_url,
+    }
     if _rec_proc is None:
         ui_error("Failed to start recording")
         return
 
-    # Start a progress watcher thread to update INFO
-    def _watch():
-        buf = {}
-        try:
-            while _rec_proc and _rec_proc.poll() is None:
-                line = _rec_proc.stdout.readline()
-                if not line:
-                    sleep(0.1)
-                    continue
-                line = line.strip()
-                if "=" in line:
-                    k, v = line.split("=", 1)
-                    buf[k] = v
-                    if k == "progress":
-                        # emit an update on each progress marker
-                        elapsed = buf.get("out_time", "")
-                        try:
-                            size_b = int(buf.get("total_size", "0"))
-                        except Exception:
-                            size_b = 0
-                        if size_b >= 1024 * 1024:
-                            size_str = f"{size_b/1024/1024:.1f} MiB"
-                        elif size_b >= 1024:
-                            size_str = f"{size_b/1024:.0f} KiB"
-                        else:
-                            size_str = f"{size_b} B"
-                        br = buf.get("bitrate", "")
-                        sp = buf.get("speed", "")
-                        try:
-                            set_info_text(
-                                f"Recording… to: {outfile_path}\nelapsed={elapsed}  size={size_str}  bitrate={br}  speed={sp}\n[dim]Press r again to stop[/]"
-                            )
-                        except Exception:
-                            pass
-                        buf.clear()
-        except Exception:
-            pass
+    station_uuid = None
+    if isinstance(global_current_station_info, dict) and target_url in (
+        global_current_station_info.get("url"),
+        global_current_station_info.get("url_resolved"),
+    ):
+        station_uuid = global_current_station_info.get("stationuuid")
+    _rec_catalog_id = catalog_call(
+        "start",
+        curr_station_name.strip(),
+        target_url,
+        outfile_path,
+        station_uuid=station_uuid,
+        codec=record_file_format,
+    )
+    if _rec_catalog_id and _global_now_playing_title:
+        catalog_call("add_track", _rec_catalog_id, _global_now_playing_title)
 
-    import threading as _threading
+    # Progress is parsed by the shared reader, the Live view samples it
+    if _rec_proc.stdout is not None:
+        progress_reader.watch(outfile_path, _rec_proc.stdout)
+    _rec_info_visible = True
 
-    _rec_thread = _threading.Thread(target=_watch, daemon=True)
-    _rec_thread.start()
+
+def stop_active_recording():
+    """Stop the recorder (if any) and hand the file to post-processing"""
+    global _rec_proc, _rec_catalog_id
+    if _rec_proc is None:
+        return
+    stop_recording_process(_rec_proc)
+    _rec_proc = None
+    snapshot = progress_store.get(_rec_outfile) or {}
+    progress_store.remove(_rec_outfile)
+
+    rec_id = _rec_catalog_id
+    _rec_catalog_id = None
+    if rec_id:
+        catalog_call("stop", rec_id, parse_elapsed(snapshot.get("elapsed", "")))
+
+    if _postprocessor is not None and os.path.exists(_rec_outfile):
+        target_format = _rec_target_format
+
+        def _processed(input_file, output_file):
+            if rec_id and output_file:
+                catalog_call("update_path", rec_id, output_file, codec=target_format)
+
+        _postprocessor.submit(
+            _rec_outfile, target_format, tags=_rec_tags, on_done=_processed
+        )
+
+
+def _format_duration(seconds) -> str:
+    if seconds is None:
+        return ""
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def handle_recordings_table(station=None, track=None, date=None, limit=100):
+    """Query the recordings catalogue and print the matches"""
+    rows = catalog_call("search", station=station, track=track, date=date, limit=limit)
+    if rows is None:
+        log.error("Could not read the recordings catalogue (date format is YYYY-MM-DD)")
+        return
+    if not rows:
+        log.info("No recordings found")
+        return
+
+    table = make_table(["Date", "Station", "Duration", "Size", "Tracks", "File"])
+    for row in rows:
+        started = datetime.datetime.fromtimestamp(row["started_at"])
+        tracks = row["tracks"]
+        if track:
+            tracks = [t for t in tracks if track.lower() in t.lower()]
+        table.add_row(
+            started.strftime("%Y-%m-%d %H:%M"),
+            row["station_name"],
+            _format_duration(row["duration"]),
+            _format_size(row["size"]) if row["size"] is not None else "",
+            "\n".join(tracks[:5]) + ("\n…" if len(tracks) > 5 else ""),
+            row["path"],
+        )
+    themed_console().print(table)
 
 
 def handle_welcome_screen():
@@ -789,6 +1056,34 @@ def handle_favorite_table(alias):
         set_info_lines(["You have no favorite station list"])
 
 
+def handle_check_favorites(handler, alias):
+    """Probe every favorite and print which of them answer"""
+    if not alias.alias_map:
+        log.info("You have no favorite station list")
+        return
+    log.info(f"Checking {len(alias.alias_map)} favorite stations...")
+    check_favorites(alias, handler)
+
+    table = make_table(["Station", "Status", "Latency", "Codec", "Stream"])
+    for entry in sorted(alias.alias_map, key=health_rank):
+        health = entry.get("health") or {}
+        if health.get("ok"):
+            status = "ok"
+            latency = f"{health.get('latency_ms', 0)} ms"
+        else:
+            status = f"dead ({health.get('failures', 1)}x)"
+            latency = health.get("error", "")[:40]
+        codec = health.get("codec") or entry.get("codec") or ""
+        bitrate = health.get("bitrate") or entry.get("bitrate")
+        if bitrate:
+            codec = f"{codec} {bitrate}k".strip()
+        table.add_row(entry["name"], status, latency, codec, health.get("resolved", ""))
+    themed_console().print(table)
+    dead = sum(1 for entry in alias.alias_map if is_dead(entry))
+    if dead:
+        log.warning(f"{dead} favorite stations did not answer, see --remove")
+
+
 def handle_show_station_info():
     """Show important information regarding the current station"""
     global global_current_station_info
@@ -829,9 +1124,22 @@ def handle_add_station(alias):
     sys.exit(0)
 
 
+def _current_station_metadata(station_uuid_url):
+    """Cached fields for a new favourite if it is the station being played"""
+    info = global_current_station_info
+    if isinstance(info, dict) and station_uuid_url.strip() in (
+        info.get("stationuuid"),
+        info.get("url"),
+        info.get("url_resolved"),
+    ):
+        return station_metadata(info)
+    return None
+
+
 def handle_add_to_favorite(alias, station_name, station_uuid_url):
+    metadata = _current_station_metadata(station_uuid_url)
     try:
-        response = alias.add_entry(station_name, station_uuid_url)
+        response = alias.add_entry(station_name, station_uuid_url, metadata)
         if not response:
             try:
                 user_input = input("Enter a different name: ")
@@ -841,23 +1149,28 @@ def handle_add_to_favorite(alias, station_name, station_uuid_url):
                 sys.exit(0)
 
             if user_input.strip() != "":
-                response = alias.add_entry(user_input.strip(), station_uuid_url)
+                response = alias.add_entry(
+                    user_input.strip(), station_uuid_url, metadata
+                )
     except Exception as e:
         log.debug("Error: {}".format(e))
         log.error("Could not add to favorite. Already in list?")
 
 
 def handle_station_uuid_play(handler, station_uuid):
+    global global_current_station_info
     log.debug("Searching API for: {}".format(station_uuid))
 
-    handler.play_by_station_uuid(station_uuid)
-
-    log.debug("increased click count for: {}".format(station_uuid))
+    with tracing.span("station_lookup", uuid=station_uuid):
+        handler.play_by_station_uuid(station_uuid)
 
+    # counted once per session, sent in the background
     handler.vote_for_uuid(station_uuid)
     try:
         station_name = handler.target_station["name"]
         station_url = handler.target_station["url"]
+        # keep codec/bitrate etc. around for the Info panel and the recorder
+        global_current_station_info = handler.target_station
     except Exception as e:
         log.debug("{}".format(e))
         log.error("Something went wrong")
@@ -866,6 +1179,68 @@ def handle_station_uuid_play(handler, station_uuid):
     return station_name, station_url
 
 
+def _refresh_favorite(handler, alias, name, station_uuid):
+    info = handler.station_info_by_uuid(station_uuid)
+    if info is None:
+        return
+    try:
+        alias.update_entry(name, station_metadata(info))
+    except Exception as e:
+        log.debug(f"Could not update favorite {name}: {e}")
+
+
+def play_favorite(handler, alias, entry):
+    """Name and stream url of a favorite entry.
+    Uses the station data cached in the favorite list when there is some and
+    refreshes it in the background; otherwise asks
+    the API and stores the result for next time.
+    """
+    global global_current_station_info
+    name = entry["name"].strip()
+    value = entry["uuid_or_url"].strip()
+    cached = {k: v for k, v in entry.items() if k != "uuid_or_url"}
+    if "://" in value:
+        global_current_station_info = dict(cached, url=value)
+        return name, value
+
+    stream_url = entry.get("url") or entry.get("url_resolved")
+    if stream_url:
+        log.debug(f"Using cached station data for: {value}")
+        tracing.mark("station_lookup", uuid=value, cached=True)
+        global_current_station_info = dict(cached, stationuuid=value)
+        handler.vote_for_uuid(value)
+        threading.Thread(
+            target=_refresh_favorite,
+            args=(handler, alias, entry["name"], value),
+            daemon=True,
+        ).start()
+        return name, stream_url
+
+    station_name, station_url = handle_station_uuid_play(handler, value)
+    try:
+        alias.update_entry(entry["name"], station_metadata(global_current_station_info))
+    except Exception as e:
+        log.debug(f"Could not update favorite {name}: {e}")
+    return station_name, station_url
+
+
+def refresh_stale_favorites(handler, alias):
+    """Re-fetch the cached data of old uuid favorites, in the background"""
+
+    def _worker():
+        try:
+            alias.generate_map()
+            stale = alias.stale_entries(FAVORITE_REFRESH_AGE)[:FAVORITE_REFRESH_LIMIT]
+            for entry in stale:
+                _refresh_favorite(handler, alias, entry["name"], entry["uuid_or_url"])
+            if stale:
+                log.debug(f"Refreshed {len(stale)} favorites")
+        except Exception as e:
+            log.debug(f"Favorite refresh failed: {e}")
+
+    threading.Thread(target=_worker, daemon=True).start()
+
+
 def check_sort_by_parameter(sort_by):
     accepted_parameters = [
         "name",
@@ -922,9 +1297,14 @@ def handle_station_selection_menu(handler, last_station, alias):
             log.debug("Error: {}".format(e))
             station_selection_urls.append(last_station_info["uuid_or_url"])
 
-    fav_stations = alias.alias_map
+    fav_offset = len(station_selection_names)
+    # working stations first, fastest first, as of the last --check-favorites
+    fav_stations = sorted(alias.alias_map, key=health_rank)
     for entry in fav_stations:
-        station_selection_names.append(entry["name"].strip())
+        label = entry["name"].strip()
+        if is_dead(entry):
+            label += " (not responding)"
+        station_selection_names.append(label)
         station_selection_urls.append(entry["uuid_or_url"])
 
     options = station_selection_names
@@ -936,6 +1316,9 @@ def handle_station_selection_menu(handler, last_station, alias):
 
     _, index = pick(options, title, indicator="-->")
 
+    if index >= fav_offset:
+        return play_favorite(handler, alias, fav_stations[index - fav_offset])
+
     # check if there is direct URL or just UUID
     station_option_url = station_selection_urls[index]
     station_name = station_selection_names[index].replace("(last played station)", "")
@@ -1016,12 +1399,12 @@ def _handle_keypress_loop_hotkeys(
     volume,
 ):
     def _handle(ch: str):
-        nonlocal record_file_format, player, target_url, station_name, station_url
+        nonlocal record_file_format, target_url, station_name, station_url
         global _vu_meter_is_playing
         if ch in ("p", "P"):
             player.toggle()
             # Toggle VU meter playing state
-            _vu_meter_is_playing = not _vu_meter_is_playing
+            _vu_meter_is_playing = not player.is_paused
             _update_live_view()
         elif ch in ("i", "I"):
             handle_show_station_info()
@@ -1085,25 +1468,14 @@ def _handle_keypress_loop_hotkeys(
             if idx0 is None:
                 _update_live_view()
                 return
-            chosen = alias.alias_map[idx0]
-            chosen_name = chosen["name"].strip()
-            chosen_val = chosen["uuid_or_url"].strip()
-            # Resolve to URL if UUID
-            if "://" in chosen_val:
-                new_name, new_url = chosen_name, chosen_val
-            else:
-                new_name, new_url = handle_station_uuid_play(handler, chosen_val)
-            # Switch playback
-            try:
-                player.stop()
-            except Exception:
-                pass
+            # Resolve to URL if UUID, from the cached station data if possible
+            new_name, new_url = play_favorite(handler, alias, alias.alias_map[idx0])
+            with tracing.span("resolve_stream"):
+                new_url = start_failover_session(new_url, handler, new_name)
+            # Switch playback, in place when the backend supports it
             try:
-                from radioactive.ffplay import Ffplay
-                if hasattr(player, "program_name") and getattr(player, "program_name", "") == "ffplay":
-                    player = Ffplay(new_url, volume, loglevel)
-                else:
-                    player.start(new_url)
+                with tracing.span("player_switch", player=player.name):
+                    player.switch(new_url)
             except Exception as e:
                 set_info_text(f"Failed to start: {e}")
                 return
@@ -1171,6 +1543,7 @@ def _handle_keypress_loop_hotkeys(
             status = "enabled" if _vu_meter_enabled else "disabled"
             set_info_text(f"VU meter {status}")
         elif ch in ("q", "Q"):
+            stop_active_recording()
             player.stop()
             sys.exit(0)
 
@@ -1283,7 +1656,7 @@ def handle_user_choice_from_search_result(handler, response):
             sys.exit(1)
 
 
-def handle_direct_play(alias, station_name_or_url=""):
+def handle_direct_play(handler, alias, station_name_or_url=""):
     """Play a station directly with UUID or direct stream URL"""
     if "://" in station_name_or_url.strip():
         log.debug("Direct play: URL provided")
@@ -1304,7 +1677,7 @@ def handle_direct_play(alias, station_name_or_url=""):
             sys.exit(1)
         else:
             log.debug("Direct play: {}".format(response))
-            return response["name"], response["uuid_or_url"]
+            return play_favorite(handler, alias, response)
 
 
 def handle_play_last_station(last_station):
@@ -1374,10 +1747,9 @@ def handle_station_name_from_headers(url):
     return station_name
 
 
-def handle_play_random_station(alias):
+def handle_play_random_station(handler, alias):
     """Select a random station from favorite menu"""
     log.debug("playing a random station")
     alias_map = alias.alias_map
     index = randint(0, len(alias_map) - 1)
-    station = alias_map[index]
-    return station["name"], station["uuid_or_url"]
+    return play_favorite(handler, alias, alias_map[index])
@@ -1,54 +1,230 @@
-import subprocess
+import os
+import secrets
+import socket
 import sys
+import threading
 from shutil import which
+from time import sleep, time
 
+import requests
 from zenlog import log
 
+from radioactive.player import PlayerBackend, register_backend
 
-class VLC:
-    def __init__(self):
+# VLC's HTTP interface uses 0..512 for volume, 256 is 100%
+_VLC_VOLUME_FULL = 256
+# seconds between two looks at the playback state
+STATUS_INTERVAL = 2
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@register_backend("vlc")
+class VLC(PlayerBackend):
+    name = "vlc"
+    supports_ipc = True
+    supports_pause_without_reconnect = True
+    supports_switch_without_restart = True
+    supports_now_playing = True
+
+    def __init__(self, volume=None, loglevel="info"):
+        super().__init__(volume, loglevel)
         self.program_name = "vlc"
-        self.exe_path = which(self.program_name)
+        # cvlc is the interface-less wrapper shipped on linux
+        self.exe_path = which("cvlc") or which(self.program_name)
         log.debug(f"{self.program_name}: {self.exe_path}")
 
         if self.exe_path is None:
             log.critical(f"{self.program_name} not found, install it first please")
             sys.exit(1)
 
-        self.is_running = False
-        self.process = None
-        self.url = None
+        self.http_port = None
+        self.http_password = secrets.token_hex(8)
+        self.http_ok = False
 
     def _construct_vlc_commands(self, url):
-        return [self.exe_path, url]
+        commands = [self.exe_path, "-I", "dummy"]
+        if os.name == "nt":
+            # windows only, keeps the dummy interface from opening a console
+            commands.append("--dummy-quiet")
+        return commands + [
+            "--no-video",
+            "--extraintf",
+            "http",
+            "--http-host",
+            "127.0.0.1",
+            "--http-port",
+            str(self.http_port),
+            "--http-password",
+            self.http_password,
+            url,
+        ]
+
+    def _request(self, **params):
+        """Call the HTTP interface, returns status.json or None"""
+        if self.http_port is None:
+            return None
+        try:
+            response = requests.get(
+                f"http://127.0.0.1:{self.http_port}/requests/status.json",
+                params=params,
+                auth=("", self.http_password),
+                timeout=2,
+            )
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            log.debug(f"vlc http {params.get('command', 'status')} failed: {e}")
+            return None
+
+    def _http_alive(self):
+        return (
+            self.http_ok
+            and self.process is not None
+            and self.process.poll() is None
+        )
+
+    def _wait_for_http(self, timeout=3.0):
+        deadline = time() + timeout
+        while time() < deadline:
+            if self.process.poll() is not None:
+                return False
+            if self._request() is not None:
+                return True
+            sleep(0.1)
+        return False
 
     def start(self, url):
+        # reuse the running instance when we can
+        if self.is_running and self._http_alive():
+            self.switch(url)
+            return
+
         self.url = url
+        self.http_port = _free_port()
         vlc_commands = self._construct_vlc_commands(url)
 
         try:
-            self.process = subprocess.Popen(
-                vlc_commands,
-                shell=False,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
+            # nothing reads the output, never let it fill a pipe
+            self._spawn(vlc_commands, capture=False)
             self.is_running = True
-            log.debug(
-                f"player: {self.program_name} => PID {self.process.pid} initiated"
-            )
+            self.is_paused = False
 
         except Exception as e:
             log.error(f"Error while starting player: {e}")
+            return
+
+        self.http_ok = self._wait_for_http()
+        if not self.http_ok:
+            log.debug("vlc http interface not available, falling back to restarts")
+        elif self.volume is not None:
+            self._request(
+                command="volume", val=int(int(self.volume) * _VLC_VOLUME_FULL / 100)
+            )
+        if self.http_ok:
+            self._watch_first_audio(lambda: self._decoded_audio() > 0)
+            threading.Thread(
+                target=self._watch_status, args=(self.supervisor,), daemon=True
+            ).start()
+
+    def _watch_status(self, supervisor):
+        """Report a stopped input and audio that stopped being decoded"""
+        stopped = 0
+        decoded = None
+        while self.supervisor is supervisor and self._http_alive():
+            sleep(STATUS_INTERVAL)
+            status = self._request()
+            if status is None or self.is_paused:
+                decoded = None
+                continue
+            # a switch empties the playlist for a moment, wait for a second look
+            stopped = stopped + 1 if status.get("state") == "stopped" else 0
+            if stopped >= 2:
+                supervisor.emit("ended", "vlc: input stopped")
+                return
+            count = (status.get("stats") or {}).get("decodedaudio")
+            if status.get("state") == "playing" and count is not None:
+                if count == decoded:
+                    supervisor.emit("buffering", "vlc: no audio decoded")
+                decoded = count
+
+    def switch(self, url):
+        """Play another station in the same vlc instance"""
+        self.url = url
+        if self._request(command="pl_empty") is None:
+            self.stop()
+            self.start(url)
+            return
+        self._request(command="in_play", input=url)
+        self.is_paused = False
+        self.audio_started = False
+        # the counter may carry over from the previous input
+        before = self._decoded_audio()
+        self._watch_first_audio(lambda: self._decoded_audio() not in (0, before))
+
+    def pause(self):
+        # in place: no reconnect, the buffer is kept
+        if self._http_alive() and self._request(command="pl_forcepause") is not None:
+            self.is_paused = True
+            return True
+        return super().pause()
+
+    def resume(self):
+        if self._http_alive() and self._request(command="pl_forceresume") is not None:
+            self.is_paused = False
+            return True
+        if self.is_running:
+            self.stop()
+        return super().resume()
+
+    def set_volume(self, volume):
+        value = int(int(volume) * _VLC_VOLUME_FULL / 100)
+        if self._http_alive() and self._request(command="volume", val=value) is not None:
+            self.volume = volume
+            return True
+        return super().set_volume(volume)
+
+    def now_playing(self):
+        """Current ICY title as reported by vlc, None if unavailable"""
+        if not self._http_alive():
+            return None
+        status = self._request()
+        if status is None:
+            return None
+        try:
+            meta = status["information"]["category"]["meta"]
+        except (KeyError, TypeError):
+            return ""
+        return meta.get("now_playing", "")
+
+    def _decoded_audio(self):
+        """Audio blocks decoded so far, 0 when unknown"""
+        status = self._request() or {}
+        return (status.get("stats") or {}).get("decodedaudio", 0)
+
+    def throughput(self):
+        if not self._http_alive():
+            return None
+        status = self._request()
+        try:
+            # VLC reports bytes per microsecond, like its own statistics panel
+            return float(status["stats"]["inputbitrate"]) * 8000
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _crashed(self, event):
+        self.http_ok = False
+        super()._crashed(event)
 
     def stop(self):
         if self.is_running:
+            self._expect_exit()
             self.process.kill()
+            self.process.wait()
             self.is_running = False
-
-    def toggle(self):
-        if self.is_running:
-            self.stop()
-        else:
-            self.start(self.url)
+            self.is_paused = False
+            self.http_ok = False
@@ -59,7 +59,7 @@ setup(
     },
     packages=find_packages(exclude=["test*"]),
     install_requires=required(),
-    extras_require={"dev": required("-dev")},
+    extras_require={"dev": required("-dev"), "embedded": ["av", "sounddevice"]},
     classifiers=[
         "License :: OSI Approved :: MIT License",
         "Development Status :: 5 - Production/Stable",
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Favourites: the legacy file is migrated, lookups go through the
+name/uuid/url indexes and follow changes made by another instance."""
+
+from radioactive.alias import Alias
+
+
+def make_alias(tmp_path, monkeypatch, legacy=None):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    if legacy is not None:
+        (tmp_path / ".radio-active-alias").write_text(legacy)
+    alias = Alias()
+    alias.generate_map()
+    return alias
+
+
+def test_legacy_file_is_migrated(tmp_path, monkeypatch):
+    alias = make_alias(
+        tmp_path, monkeypatch, "Jazz FM==http://jazz/stream\n\nRock==abcd-1234\n"
+    )
+    assert (tmp_path / ".radio-active-favorites.json").exists()
+    assert (tmp_path / ".radio-active-alias").exists()
+    assert [e["name"] for e in alias.alias_map] == ["Jazz FM", "Rock"]
+
+
+def test_lookups(tmp_path, monkeypatch):
+    alias = make_alias(tmp_path, monkeypatch, "Jazz FM==http://jazz/stream\nRock==abcd\n")
+    assert alias.search("  jazz   fm ")["uuid_or_url"] == "http://jazz/stream"
+    assert alias.search_uuid("abcd")["name"] == "Rock"
+    assert alias.search_url("http://jazz/stream")["name"] == "Jazz FM"
+    assert alias.search("Pop") is None
+
+
+def test_sees_other_instances(tmp_path, monkeypatch):
+    alias = make_alias(tmp_path, monkeypatch)
+    other = Alias()
+    assert other.add_entry("Pop", "http://pop/stream", {"codec": "MP3"})
+    assert not other.add_entry("pop", "http://other/stream")
+    alias.generate_map()
+    assert alias.search("pop")["codec"] == "MP3"
+    assert alias.update_entries({"POP": {"bitrate": 128}}) == 1
+    other.generate_map()
+    assert other.search_url("http://pop/stream")["bitrate"] == 128
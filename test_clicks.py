@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Click queue: one click per station and session, failed clicks are kept
+and retried once, never queued twice."""
+
+import time
+
+from radioactive.clicks import ClickQueue
+from radioactive.storage import read_json, update_json
+
+
+def make_queue(tmp_path, send=None):
+    clicks = ClickQueue(str(tmp_path / "clicks"))
+    clicks.send = send or (lambda uuid: None)
+    return clicks
+
+
+def test_submit_once_per_session(tmp_path):
+    clicks = make_queue(tmp_path)
+    assert clicks.submit("A")
+    assert not clicks.submit("A")
+    assert list(clicks.queue.queue) == ["A"]
+
+
+def test_failed_clicks_are_kept(tmp_path):
+    def send(uuid):
+        if uuid == "B":
+            raise ConnectionError("offline")
+
+    clicks = make_queue(tmp_path, send)
+    clicks._send_batch(["A", "B"])
+    assert list(read_json(clicks.path)) == ["B"]
+
+
+def test_retry_does_not_queue_twice(tmp_path):
+    clicks = make_queue(tmp_path)
+    now = time.time()
+    update_json(clicks.path, lambda pending: pending.update(A=now, B=now))
+    clicks.submit("B")
+    clicks.queued.add("A")  # being sent
+    clicks._send_batch(["A"])
+    assert list(clicks.queue.queue) == ["B"]
+    assert read_json(clicks.path) == {"B": now}
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""--filter on the columnar StationTable must select exactly what the old
+per-station implementation selected, in the same order."""
+
+import random
+
+from zenlog import log
+
+from radioactive.filter import filter_expressions
+
+EXPRESSIONS = [
+    "name=jazz",
+    "name!=jazz,rock",
+    "country=de,us",
+    "countrycode=DE",
+    "codec=aac",
+    "bitrate>64",
+    "votes<100&codec=mp3",
+    "tags=rock&bitrate=128&language!=german",
+    "bitrate!5",
+    "foo=bar",
+    "name",
+    "clickcount=10",
+    "language=english&country!=de&votes>500",
+]
+
+STRING_KEYS = [
+    ("name", "name"),
+    ("language", "language"),
+    ("country", "countrycode"),
+    ("tags", "tags"),
+    ("codec", "codec"),
+]
+NUMERIC_KEYS = [("bitrate", "bitrate"), ("clickcount", "clickcount"), ("votes", "votes")]
+
+
+def reference_filter(data, input_expression):
+    """The filter as it was before StationTable: one pass over the dicts"""
+    for expression in input_expression.split("&"):
+        if not data:
+            break
+        data = _reference_expression(data, expression)
+    return data
+
+
+def _reference_expression(data, expression):
+    for name, key in STRING_KEYS:
+        if name in expression:
+            exclude = "!=" in expression
+            if not exclude and "=" not in expression:
+                return []
+            needles = expression.split("!=" if exclude else "=")[1].split(",")
+            needles = [needle.lower() for needle in needles]
+            result = []
+            for entry in data:
+                value = (entry.get(key) or "").lower()
+                if value and any(needle in value for needle in needles) != exclude:
+                    result.append(entry)
+            return result
+    for name, key in NUMERIC_KEYS:
+        if name in expression:
+            param = expression.split(key)[1]
+            operator, value = param[0], int(param[1:]) if param[0] in "<>=" else 0
+            if operator == "<":
+                return [e for e in data if int(e[key]) < value]
+            if operator == ">":
+                return [e for e in data if int(e[key]) > value]
+            if operator == "=":
+                return [e for e in data if int(e[key]) == value]
+            return data
+    return data
+
+
+def make_stations(count, seed=1):
+    rng = random.Random(seed)
+    return [
+        {
+            "name": rng.choice(["Jazz FM", "Rock Radio", "BBC One", "jazzy", "", None]),
+            "countrycode": rng.choice(["DE", "US", "GB", "FR", "IN", "", None]),
+            "codec": rng.choice(["MP3", "AAC", "AAC+", "OGG", ""]),
+            "language": rng.choice(["english", "german", ""]),
+            "tags": rng.choice(["jazz,blues", "rock", "", "pop,rock"]),
+            "bitrate": rng.choice([0, 64, 128, 320]),
+            "votes": rng.randint(0, 1000),
+            "clickcount": rng.randint(0, 500),
+        }
+        for _ in range(count)
+    ]
+
+
+def test_filter_matches_reference():
+    log.level("error")
+    stations = make_stations(5000)
+    for expression in EXPRESSIONS:
+        expected = reference_filter(stations, expression)
+        result = filter_expressions(stations, expression)
+        assert [id(s) for s in result] == [id(s) for s in expected], expression
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Metrics registry renders valid Prometheus text: one HELP/TYPE per
+metric, escaped labels, cumulative histogram buckets."""
+
+from radioactive.metrics import LATENCY_BUCKETS, Metrics
+
+
+def test_render_counters_and_gauges():
+    metrics = Metrics()
+    metrics.inc("radioactive_player_restarts_total", reason="crash")
+    metrics.inc("radioactive_player_restarts_total", reason="crash")
+    metrics.inc("radioactive_player_restarts_total", reason="stall")
+    metrics.set("radioactive_stream_throughput_kbps", 127.5)
+    metrics.set("radioactive_recording_bytes", 10, file='a "b"\\c')
+    lines = metrics.render().splitlines()
+
+    assert lines.count("# TYPE radioactive_player_restarts_total counter") == 1
+    assert 'radioactive_player_restarts_total{reason="crash"} 2' in lines
+    assert 'radioactive_player_restarts_total{reason="stall"} 1' in lines
+    assert "radioactive_stream_throughput_kbps 127.5" in lines
+    assert 'radioactive_recording_bytes{file="a \\"b\\"\\\\c"} 10' in lines
+
+
+def test_render_histogram():
+    metrics = Metrics()
+    for seconds in (0.01, 0.3, 20):
+        metrics.observe("radioactive_api_request_seconds", seconds, endpoint="tags")
+    text = metrics.render()
+
+    buckets = [
+        int(line.rsplit(" ", 1)[1])
+        for line in text.splitlines()
+        if line.startswith("radioactive_api_request_seconds_bucket")
+    ]
+    assert len(buckets) == len(LATENCY_BUCKETS) + 1
+    assert buckets == sorted(buckets)
+    assert buckets[0] == 1 and buckets[-2] == 2 and buckets[-1] == 3
+    assert 'radioactive_api_request_seconds_count{endpoint="tags"} 3' in text
+
+
+def test_collectors_run_at_render():
+    metrics = Metrics()
+    metrics.add_collector(lambda m: m.set("radioactive_recording_speed", 1.0))
+    metrics.add_collector(lambda m: 1 / 0)
+    assert "radioactive_recording_speed 1.0" in metrics.render()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""atomic_write/file_lock/update_json: modes are kept, locks do not wait
+forever and nested locks in one thread do not wait on themselves."""
+
+import os
+import subprocess
+import sys
+import time
+
+from radioactive import storage
+from radioactive.storage import atomic_write, file_lock, read_json, update_json
+
+
+def test_atomic_write_keeps_mode(tmp_path):
+    path = str(tmp_path / "data.json")
+    atomic_write(path, "{}")
+    os.chmod(path, 0o640)
+    atomic_write(path, '{"a": 1}')
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert read_json(path) == {"a": 1}
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_update_json_merges(tmp_path):
+    path = str(tmp_path / "data.json")
+    update_json(path, lambda data: data.__setitem__("a", 1))
+    update_json(path, lambda data: data.__setitem__("b", 2))
+    assert read_json(path) == {"a": 1, "b": 2}
+
+
+def test_nested_lock_does_not_wait(tmp_path):
+    path = str(tmp_path / "data.json")
+    started = time.time()
+    with file_lock(path):
+        with file_lock(path):
+            pass
+    assert time.time() - started < 1
+
+
+def test_lock_wait_is_bounded(tmp_path):
+    path = str(tmp_path / "data.json")
+    waiter = (
+        "import time; from radioactive import storage; storage.LOCK_TIMEOUT = 1\n"
+        f"started = time.time()\nwith storage.file_lock({path!r}): pass\n"
+        "print(time.time() - started)"
+    )
+    with file_lock(path):
+        out = subprocess.run(
+            [sys.executable, "-c", waiter],
+            capture_output=True,
+            text=True,
+            timeout=storage.LOCK_TIMEOUT + 5,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout
+    assert 0.9 < float(out.split()[-1]) < 5